@@ -0,0 +1,90 @@
+"""counter_shards
+
+Revision ID: 40f6a0367ea9
+Revises: 7a6d1f4458e9
+Create Date: 2026-10-19 00:50:37.804215
+
+The existing counter rows become shard 0 of their counter. The totals,
+which are only updated and never inserted by note writes, get a row for
+every shard when they have been built; crud_analytics.COUNTER_SHARDS must
+not exceed the number created here.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '40f6a0367ea9'
+down_revision: Union[str, None] = '7a6d1f4458e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTER_SHARDS = 16
+
+# Sharded counters, with the columns of their key before the shard and
+# the column they count in.
+SHARDED = {
+    'data_versions': (['name'], 'version'),
+    'edit_rollups': (['hour'], 'edits'),
+    'row_counts': (['name'], 'count'),
+}
+
+
+def upgrade() -> None:
+    for table, (key, _) in SHARDED.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('shard', sa.Integer(), server_default='0', nullable=False))
+            batch_op.drop_constraint(f'{table}_pkey', type_='primary')
+            batch_op.create_primary_key(f'{table}_pkey', key + ['shard'])
+
+    op.execute(
+        f"""
+        INSERT INTO public.analytics_totals (id, note_count, total_words, total_chars, rebuilt_at)
+        SELECT shard, 0, 0, 0, totals.rebuilt_at
+        FROM generate_series(0, {COUNTER_SHARDS - 1}) AS shard,
+             (SELECT max(rebuilt_at) AS rebuilt_at FROM public.analytics_totals) AS totals
+        WHERE EXISTS (SELECT 1 FROM public.analytics_totals)
+        ON CONFLICT (id) DO NOTHING
+        """
+    )
+
+
+def downgrade() -> None:
+    # The shards of each counter are added up into the single row it had.
+    op.execute(
+        """
+        INSERT INTO public.analytics_totals (id, note_count, total_words, total_chars, rebuilt_at)
+        SELECT 1, sum(note_count), sum(total_words), sum(total_chars), max(rebuilt_at)
+        FROM public.analytics_totals
+        WHERE id <> 1
+        HAVING count(*) > 0
+        ON CONFLICT (id) DO UPDATE
+        SET note_count = analytics_totals.note_count + excluded.note_count,
+            total_words = analytics_totals.total_words + excluded.total_words,
+            total_chars = analytics_totals.total_chars + excluded.total_chars
+        """
+    )
+    op.execute("DELETE FROM public.analytics_totals WHERE id <> 1")
+
+    for table, (key, value) in SHARDED.items():
+        columns = ', '.join(key)
+        op.execute(
+            f"""
+            INSERT INTO public.{table} ({columns}, shard, {value})
+            SELECT {columns}, 0, sum({value})
+            FROM public.{table}
+            WHERE shard <> 0
+            GROUP BY {columns}
+            ON CONFLICT ({columns}, shard) DO UPDATE
+            SET {value} = {table}.{value} + excluded.{value}
+            """
+        )
+        op.execute(f"DELETE FROM public.{table} WHERE shard <> 0")
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'{table}_pkey', type_='primary')
+            batch_op.create_primary_key(f'{table}_pkey', key)
+            batch_op.drop_column('shard')
@@ -1,16 +1,339 @@
-import google.generativeai as genai
+import asyncio
+import hashlib
+import logging
+import time
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Tuple
 
+from app import metrics
+from app.ai_service.backends import get_backend
+from app.ai_service.resilience import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, TokenBucket
+from app.ai_service.single_flight import SingleFlight
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+backend = get_backend(settings.SUMMARY_BACKEND)
+
+fallback_backend = (
+    get_backend(settings.SUMMARY_FALLBACK_BACKEND)
+    if settings.SUMMARY_FALLBACK_BACKEND
+    else None
+)
+
+# Cache key of the summaries produced by the configured backend.
+MODEL_ID = backend.model_id
+PROMPT_VERSION = backend.prompt_version
+
+# Every backend call takes a token from the rate limiter and a slot from the
+# adaptive concurrency limiter, and is refused while the breaker is open.
+rate_limiter = TokenBucket(
+    "summary",
+    rate=settings.SUMMARY_RATE_LIMIT,
+    burst=settings.SUMMARY_RATE_BURST,
+)
+limiter = AdaptiveLimiter(
+    "summary",
+    min_limit=settings.SUMMARY_MIN_CONCURRENCY,
+    max_limit=settings.SUMMARY_MAX_CONCURRENCY,
+    latency_target=settings.SUMMARY_LATENCY_TARGET,
+)
+breaker = CircuitBreaker(
+    "summary",
+    failure_threshold=settings.SUMMARY_BREAKER_FAILURES,
+    reset_timeout=settings.SUMMARY_BREAKER_RESET,
+)
+
+# Concurrent requests for the same content share one backend call.
+single_flight = SingleFlight("summary")
+
+
+def _is_overload(error: Exception) -> bool:
+    return isinstance(error, asyncio.TimeoutError) or getattr(error, "code", None) == 429
+
+
+async def _call_backend(call: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+    """Run one backend call under the breaker, the limiters and ``timeout``.
+
+    ``ValueError`` means the provider answered with something unusable, so
+    it does not count against the provider's health.
+    """
+
+    breaker.check()
+    recorded = False
+
+    try:
+        async with limiter:
+            await rate_limiter.acquire()
+            started = time.monotonic()
+
+            try:
+                result = await asyncio.wait_for(call(), timeout=timeout)
+
+            except Exception as e:
+                recorded = True
+                limiter.record(time.monotonic() - started, overloaded=_is_overload(e))
+                if isinstance(e, ValueError):
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                    if _is_overload(e):
+                        metrics.increment("summary_overloads")
+                raise
+
+            recorded = True
+            limiter.record(time.monotonic() - started)
+            breaker.record_success()
+
+            return result
+
+    finally:
+        # Cancelled before there was an outcome, also while waiting for the
+        # limiters: let the next call probe a half-open breaker.
+        if not recorded:
+            breaker.record_cancel()
+
+
+async def fallback_summary(note_content: str) -> str:
+    """Summary to show when the configured backend has none.
+
+    Uses ``SUMMARY_FALLBACK_BACKEND`` when it is set, the raw content
+    otherwise.
+    """
 
+    if fallback_backend is not None:
+        try:
+            return await fallback_backend.summarize(note_content)
+        except Exception as e:
+            logger.warning(f"Fallback summary failed: {e!r}")
 
-async def get_summarize_note(note_content: str) -> str:
+    return note_content
+
+
+async def _summarize_one(note_content: str) -> str | None:
     try:
-        model = genai.GenerativeModel("gemini-1.5-pro-latest")
-        response = model.generate_content(f"Summarize this text in one short sentence: {note_content}")
-        return response.text
+        return await _call_backend(
+            partial(backend.summarize, note_content),
+            timeout=settings.SUMMARY_TIMEOUT,
+        )
+    except CircuitOpenError:
+        return None
     except Exception as e:
-        return f"Summing error: {str(e)}"
+        logger.warning(f"Summary failed: {e!r}")
+        return None
+
+
+async def try_summarize_notes(notes_content: List[str]) -> List[str | None]:
+    """Summarize notes concurrently, keeping the input order.
+
+    Calls go through the rate limiter, the adaptive concurrency limit (at
+    most ``SUMMARY_MAX_CONCURRENCY``) and the circuit breaker, and each one
+    is limited to ``SUMMARY_TIMEOUT`` seconds. A note whose summary fails,
+    times out or is refused by the open breaker gets ``None``.
+    """
+
+    return await asyncio.gather(
+        *(
+            single_flight.do(content_hash(content), partial(_summarize_one, content))
+            for content in notes_content
+        )
+    )
+
+
+def pack_batches(notes_content: List[str]) -> List[List[int]]:
+    """Group note indexes into batches that fit the batch budget.
+
+    Notes are packed in order until ``SUMMARY_BATCH_MAX_CHARS`` or
+    ``SUMMARY_BATCH_MAX_NOTES`` would be exceeded. A note that is larger than
+    the budget on its own gets a batch of one.
+    """
+
+    batches = []
+    batch, batch_chars = [], 0
+
+    for index, content in enumerate(notes_content):
+        too_long = batch_chars + len(content) > settings.SUMMARY_BATCH_MAX_CHARS
+        too_many = len(batch) >= settings.SUMMARY_BATCH_MAX_NOTES
+        if batch and (too_long or too_many):
+            batches.append(batch)
+            batch, batch_chars = [], 0
+
+        batch.append(index)
+        batch_chars += len(content)
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+async def _summarize_batch(notes_content: List[str]) -> List[str | None]:
+    if len(notes_content) == 1:
+        return [await _summarize_one(notes_content[0])]
+
+    try:
+        return await _call_backend(
+            partial(backend.summarize_batch, notes_content),
+            timeout=settings.SUMMARY_BATCH_TIMEOUT,
+        )
+    except CircuitOpenError:
+        return [None] * len(notes_content)
+    except Exception as e:
+        logger.warning(f"Batch summary failed, retrying per note: {e!r}")
+
+    return await asyncio.gather(
+        *(_summarize_one(content) for content in notes_content)
+    )
+
+
+async def _summarize_batches(notes_content: List[str]) -> List[str | None]:
+    batches = pack_batches(notes_content)
+    results = await asyncio.gather(
+        *(
+            _summarize_batch([notes_content[index] for index in batch])
+            for batch in batches
+        )
+    )
+
+    summaries = [None] * len(notes_content)
+    for batch, batch_summaries in zip(batches, results):
+        for index, summary in zip(batch, batch_summaries):
+            summaries[index] = summary
+
+    return summaries
+
+
+async def try_summarize_batch(notes_content: List[str]) -> List[str | None]:
+    """Summarize notes with as few backend calls as possible.
+
+    Duplicate contents are summarized once, and contents already being
+    summarized by another caller are awaited instead of sent again. The rest
+    is packed into batches by ``pack_batches`` and every batch is one backend
+    call. A batch that fails falls back to one call per note. The result
+    keeps the input order; failed notes get ``None``.
+    """
+
+    contents = {content_hash(content): content for content in notes_content}
+
+    summaries = await single_flight.do_many(
+        list(contents),
+        lambda hashes: _summarize_batches([contents[key] for key in hashes]),
+    )
+    summaries = dict(zip(contents, summaries))
+
+    return [summaries[content_hash(content)] for content in notes_content]
+
+
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """Split ``text`` into chunks of at most ``max_chars`` characters.
+
+    Chunks end on a paragraph, line, sentence or word boundary when one is
+    found in the second half of the chunk, and are cut hard otherwise.
+    """
+
+    chunks = []
+
+    while len(text) > max_chars:
+        cut = max_chars
+        for separator in ("\n\n", "\n", ". ", " "):
+            position = text.rfind(separator, max_chars // 2, max_chars)
+            if position != -1:
+                cut = position + len(separator)
+                break
+
+        chunks.append(text[:cut])
+        text = text[cut:]
+
+    if text.strip() or not chunks:
+        chunks.append(text)
+
+    return chunks
+
+
+async def _summarize_or_fallback(text: str) -> Tuple[str, bool]:
+    summary = (await try_summarize_notes([text]))[0]
+    if summary is not None:
+        return summary, False
+
+    return await fallback_summary(text), True
+
+
+async def _reduce(summaries: List[str]) -> Tuple[str, bool]:
+    combined = "\n".join(summaries)
+    fallback = False
+
+    for _ in range(settings.SUMMARY_REDUCE_MAX_DEPTH):
+        if len(combined) <= settings.SUMMARY_CHUNK_CHARS:
+            break
+
+        results = await asyncio.gather(
+            *(
+                _summarize_or_fallback(chunk)
+                for chunk in chunk_text(combined, settings.SUMMARY_CHUNK_CHARS)
+            )
+        )
+        combined = "\n".join(summary for summary, _ in results)
+        fallback = fallback or any(chunk_fallback for _, chunk_fallback in results)
+
+    summary, summary_fallback = await _summarize_or_fallback(combined)
+
+    return summary, fallback or summary_fallback
+
+
+async def map_reduce_summary(note_content: str) -> AsyncIterator[Tuple[str, dict]]:
+    """Summarize a note of any size, yielding progress events.
+
+    The note is split into ``SUMMARY_CHUNK_CHARS`` chunks that are
+    summarized concurrently. Every chunk summary is yielded as a
+    ``partial`` event as soon as it is ready, in completion order. The
+    partial summaries are then reduced, in more rounds if they are still
+    too long, to the final ``summary`` event. Its ``fallback`` flag tells
+    whether any part had to use ``fallback_summary``.
+    """
+
+    chunks = chunk_text(note_content, settings.SUMMARY_CHUNK_CHARS)
+    yield "start", {"chunks": len(chunks)}
+
+    if len(chunks) == 1:
+        summary, fallback = await _summarize_or_fallback(note_content)
+        yield "summary", {"summary": summary, "fallback": fallback}
+        return
+
+    async def summarize_chunk(index: int, chunk: str):
+        return index, await _summarize_or_fallback(chunk)
+
+    tasks = [
+        asyncio.ensure_future(summarize_chunk(index, chunk))
+        for index, chunk in enumerate(chunks)
+    ]
+
+    try:
+        partials = [None] * len(chunks)
+        fallback = False
+
+        for task in asyncio.as_completed(tasks):
+            index, (summary, chunk_fallback) = await task
+            partials[index] = summary
+            fallback = fallback or chunk_fallback
+            yield "partial", {"index": index, "summary": summary}
+
+        summary, reduce_fallback = await _reduce(partials)
+        yield "summary", {"summary": summary, "fallback": fallback or reduce_fallback}
+
+    finally:
+        # Only stops this stream waiting: a chunk summary that another
+        # caller shares through single_flight keeps running for it.
+        for task in tasks:
+            task.cancel()
+
+
+def content_hash(note_content: str) -> str:
+    return hashlib.sha256(note_content.encode("utf-8")).hexdigest()
+
+
+def close() -> None:
+    backend.close()
+    if fallback_backend is not None:
+        fallback_backend.close()
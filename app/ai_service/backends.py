@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class SummaryBackend(ABC):
+    """A way of turning note content into a short summary.
+
+    ``model_id`` and ``prompt_version`` identify the output in the summary
+    cache, so they must change whenever the summaries would.
+    """
+
+    model_id: str
+    prompt_version: str = "v1"
+
+    @abstractmethod
+    async def summarize(self, note_content: str) -> str:
+        """Summarize one note, raising on failure."""
+
+    async def summarize_batch(self, notes_content: List[str]) -> List[str]:
+        """Summarize several notes at once, raising on failure."""
+
+        return [await self.summarize(content) for content in notes_content]
+
+    def close(self) -> None:
+        pass
+
+
+def get_backend(name: str) -> SummaryBackend:
+    if name == "gemini":
+        from app.ai_service.gemini import GeminiBackend
+        return GeminiBackend()
+
+    if name == "extractive":
+        from app.ai_service.extractive import ExtractiveBackend
+        return ExtractiveBackend()
+
+    raise ValueError(f"Unknown summary backend: {name}")
@@ -0,0 +1,96 @@
+import re
+from typing import List
+
+import numpy as np
+
+from app.ai_service.backends import SummaryBackend
+from app.config import get_settings
+
+settings = get_settings()
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+STOP_WORDS = frozenset(
+    """
+    a about above after again against all am an and any are as at be because
+    been before being below between both but by can could did do does doing
+    down during each few for from further had has have having he her here hers
+    herself him himself his how i if in into is it its itself just me more
+    most my myself no nor not now of off on once only or other our ours
+    ourselves out over own same she should so some such than that the their
+    theirs them themselves then there these they this those through to too
+    under until up very was we were what when where which while who whom why
+    will with would you your yours yourself yourselves
+    """.split()
+)
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_RE.split(text) if sentence.strip()]
+
+
+def summarize_text(text: str, max_sentences: int = 1) -> str:
+    """Pick the ``max_sentences`` sentences closest to the note's centroid.
+
+    Sentences are TF-IDF vectors over their non stop words, with every
+    sentence treated as a document. The centroid is the sum of those
+    vectors, so sentences that share the note's most distinctive words
+    score highest. The picked sentences keep their original order.
+
+    Everything is computed on flat (sentence, word) arrays, so memory stays
+    linear in the note size however large the vocabulary is.
+    """
+
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    vocabulary = {}
+    rows, cols = [], []
+    for row, sentence in enumerate(sentences):
+        for word in WORD_RE.findall(sentence.lower()):
+            if word not in STOP_WORDS:
+                rows.append(row)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    if not vocabulary:
+        return " ".join(sentences[:max_sentences])
+
+    sentence_count, word_count = len(sentences), len(vocabulary)
+
+    pairs, counts = np.unique(
+        np.asarray(rows) * word_count + np.asarray(cols),
+        return_counts=True,
+    )
+    pair_rows, pair_cols = np.divmod(pairs, word_count)
+
+    document_frequency = np.bincount(pair_cols, minlength=word_count)
+    idf = np.log((1 + sentence_count) / (1 + document_frequency)) + 1
+
+    weights = counts * idf[pair_cols]
+    centroid = idf * np.bincount(pair_cols, weights=counts, minlength=word_count)
+
+    dot = np.bincount(pair_rows, weights=weights * centroid[pair_cols], minlength=sentence_count)
+    norms = np.sqrt(np.bincount(pair_rows, weights=weights ** 2, minlength=sentence_count))
+    scores = np.divide(dot, norms, out=np.zeros(sentence_count), where=norms > 0)
+
+    best = np.sort(np.argsort(-scores, kind="stable")[:max_sentences])
+
+    return " ".join(sentences[index] for index in best)
+
+
+class ExtractiveBackend(SummaryBackend):
+    """Offline summaries built from the note's own sentences."""
+
+    prompt_version = "v1"
+
+    def __init__(self):
+        self.max_sentences = settings.SUMMARY_EXTRACTIVE_SENTENCES
+        self.model_id = f"extractive-tfidf-{self.max_sentences}"
+
+    async def summarize(self, note_content: str) -> str:
+        return summarize_text(note_content, self.max_sentences)
+
+    async def summarize_batch(self, notes_content: List[str]) -> List[str]:
+        return [summarize_text(content, self.max_sentences) for content in notes_content]
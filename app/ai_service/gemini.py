@@ -0,0 +1,107 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List
+
+import google.generativeai as genai
+
+from app.ai_service.backends import SummaryBackend
+from app.config import get_settings
+
+settings = get_settings()
+
+genai.configure(api_key=settings.GEMINI_API_KEY)
+
+# Bump PROMPT_VERSION whenever SUMMARY_PROMPT or SUMMARY_BATCH_PROMPT
+# changes so that summaries cached for the old prompts are no longer served.
+SUMMARY_PROMPT = "Summarize this text in one short sentence: {content}"
+SUMMARY_BATCH_PROMPT = (
+    "Summarize each of the following notes in one short sentence. "
+    "Answer with a JSON array that has one object per note, in the same order, "
+    'shaped like {{"id": <note id>, "summary": "<summary>"}}.\n\n{notes}'
+)
+PROMPT_VERSION = "v1"
+
+
+def parse_batch_response(text: str, count: int) -> List[str]:
+    """Split a batch answer back into per-note summaries.
+
+    Raises ``ValueError`` unless the answer holds exactly one non-empty
+    summary for each of the ``count`` notes.
+    """
+
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+
+    items = json.loads(text)
+    if not isinstance(items, list):
+        raise ValueError("Batch answer is not a list")
+
+    summaries = {}
+    for item in items:
+        if (
+                not isinstance(item, dict)
+                or not isinstance(item.get("id"), int) or isinstance(item.get("id"), bool)
+                or not isinstance(item.get("summary"), str)
+        ):
+            raise ValueError(f"Malformed batch item: {item!r}")
+        summaries[item.get("id")] = item["summary"].strip()
+
+    if sorted(summaries) != list(range(count)) or not all(summaries.values()):
+        raise ValueError(f"Batch answer does not cover {count} notes")
+
+    return [summaries[index] for index in range(count)]
+
+
+class GeminiBackend(SummaryBackend):
+    prompt_version = PROMPT_VERSION
+
+    def __init__(self):
+        self.model_id = settings.GEMINI_MODEL
+        self.model = genai.GenerativeModel(self.model_id)
+
+        # The SDK call is blocking, so it runs on a dedicated pool instead of
+        # the event loop. The pool is sized like the largest concurrency limit
+        # so that admitted calls never queue behind each other.
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.SUMMARY_MAX_CONCURRENCY,
+            thread_name_prefix="gemini",
+        )
+
+    async def _generate(self, prompt: str, timeout: float, **kwargs) -> str:
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self.executor,
+            partial(
+                self.model.generate_content,
+                prompt,
+                request_options={"timeout": timeout},
+                **kwargs,
+            ),
+        )
+        return response.text
+
+    async def summarize(self, note_content: str) -> str:
+        return await self._generate(
+            SUMMARY_PROMPT.format(content=note_content),
+            timeout=settings.SUMMARY_TIMEOUT,
+        )
+
+    async def summarize_batch(self, notes_content: List[str]) -> List[str]:
+        notes = "\n\n".join(
+            json.dumps({"id": index, "content": content}, ensure_ascii=False)
+            for index, content in enumerate(notes_content)
+        )
+
+        text = await self._generate(
+            SUMMARY_BATCH_PROMPT.format(notes=notes),
+            timeout=settings.SUMMARY_BATCH_TIMEOUT,
+            generation_config={"response_mime_type": "application/json"},
+        )
+
+        return parse_batch_response(text, len(notes_content))
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
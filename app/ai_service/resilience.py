@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+from app import metrics
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class TokenBucket:
+    """Client-side request rate limit: ``rate`` calls per second, ``burst`` at once."""
+
+    def __init__(self, name: str, rate: float, burst: int):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+
+            self.tokens -= 1
+            metrics.set_gauge(f"{self.name}_rate_tokens", self.tokens)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that follows the provider's health (AIMD).
+
+    Every successful call within ``latency_target`` seconds raises the limit
+    by ``1 / limit``, so roughly by one per round of ``limit`` calls. A 429,
+    a timeout or a slow call halves it, at most once per ``latency_target``
+    so that one burst of errors does not collapse it to the minimum.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            min_limit: int,
+            max_limit: int,
+            latency_target: float,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.decreased_at = 0.0
+        self._condition = asyncio.Condition()
+        self._report()
+
+    def _report(self) -> None:
+        metrics.set_gauge(f"{self.name}_limiter_limit", self.limit)
+        metrics.set_gauge(f"{self.name}_limiter_in_flight", self.in_flight)
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            self._report()
+
+    async def __aexit__(self, *exc_info):
+        async with self._condition:
+            self.in_flight -= 1
+            self._report()
+            self._condition.notify_all()
+
+    def record(self, latency: float, overloaded: bool = False) -> None:
+        now = time.monotonic()
+
+        if overloaded or latency > self.latency_target:
+            if now - self.decreased_at >= self.latency_target:
+                self.limit = max(self.min_limit, self.limit / 2)
+                self.decreased_at = now
+                metrics.increment(f"{self.name}_limiter_decreases")
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        self._report()
+
+
+class CircuitBreaker:
+    """Stop calling a provider that keeps failing.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls fail fast with ``CircuitOpenError``. Once ``reset_timeout`` seconds
+    have passed it lets a single probe through (half-open): a success
+    closes it, a failure opens it again.
+    """
+
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self._report()
+
+    def _report(self) -> None:
+        metrics.set_gauge(f"{self.name}_breaker_state", self.state)
+        metrics.set_gauge(f"{self.name}_breaker_failures", self.failures)
+
+    def _set_state(self, state: int) -> None:
+        self.state = state
+        self._report()
+
+    def allows_calls(self) -> bool:
+        if self.state == self.OPEN:
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+        if self.state == self.HALF_OPEN:
+            return not self.probing
+        return True
+
+    def check(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go through now."""
+
+        if not self.allows_calls():
+            metrics.increment(f"{self.name}_breaker_rejected")
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        if self.state == self.OPEN:
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            self.probing = True
+
+    def record_success(self) -> None:
+        self.probing = False
+        self.failures = 0
+        self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self.probing = False
+        self.failures += 1
+
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(self.OPEN)
+        else:
+            self._report()
+
+    def record_cancel(self) -> None:
+        self.probing = False
@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+from app import metrics
+
+
+class _Flight:
+    """One call for some keys, and the number of callers waiting for it."""
+
+    def __init__(self, futures: Dict[Hashable, asyncio.Future]):
+        self.futures = futures
+        self.callers = 0
+        self.task: asyncio.Task | None = None
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers of the same key.
+
+    The first caller of a key runs the call; callers that arrive while it is
+    in flight wait for its result instead of starting their own. Nothing is
+    kept once the call finishes, so this is not a cache.
+
+    The call runs in a task of its own, so a caller that is cancelled only
+    stops waiting. The call itself is cancelled once no caller waits for it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Flight] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        results = await self.do_many([key], lambda keys: _call_one(fn))
+        return results[0]
+
+    async def _run(self, flight: _Flight, fn: Callable[[List[Hashable]], Awaitable[List[Any]]]) -> None:
+        keys = list(flight.futures)
+
+        try:
+            for key, result in zip(keys, await fn(keys), strict=True):
+                flight.futures[key].set_result(result)
+
+        except BaseException as e:
+            for future in flight.futures.values():
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    # Mark it retrieved, there may be nobody waiting for it.
+                    future.exception()
+            if not isinstance(e, Exception):
+                raise
+
+        finally:
+            for key in keys:
+                if self._calls.get(key) is flight:
+                    del self._calls[key]
+
+    async def do_many(
+            self,
+            keys: List[Hashable],
+            fn: Callable[[List[Hashable]], Awaitable[List[Any]]],
+    ) -> List[Any]:
+        """Resolve unique ``keys`` with at most one call of ``fn``.
+
+        Keys that are already in flight are awaited. ``fn`` is called once
+        with the remaining keys and must return their results in order.
+        """
+
+        flights = {key: self._calls[key] for key in keys if key in self._calls}
+        leading = [key for key in keys if key not in flights]
+
+        metrics.increment(f"{self.name}_singleflight_leaders", len(leading))
+        metrics.increment(f"{self.name}_singleflight_coalesced", len(flights))
+
+        if leading:
+            loop = asyncio.get_running_loop()
+            flight = _Flight({key: loop.create_future() for key in leading})
+            for key in leading:
+                self._calls[key] = flight
+                flights[key] = flight
+            flight.task = asyncio.create_task(self._run(flight, fn))
+
+        waited = {id(flight): flight for flight in flights.values()}.values()
+        for flight in waited:
+            flight.callers += 1
+
+        try:
+            return [await asyncio.shield(flights[key].futures[key]) for key in keys]
+
+        finally:
+            for flight in waited:
+                flight.callers -= 1
+                if not flight.callers:
+                    flight.task.cancel()
+
+
+async def _call_one(fn: Callable[[], Awaitable[Any]]) -> List[Any]:
+    return [await fn()]
@@ -0,0 +1,44 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+
+def length_distribution(
+        lengths: np.ndarray,
+        bins: int,
+        weights: Optional[np.ndarray] = None,
+) -> Tuple[Dict[str, float], Optional[Tuple[List[float], List[int]]]]:
+    """Percentiles and an equal-width histogram of note lengths.
+
+    With ``weights``, ``lengths`` are distinct lengths and ``weights`` the
+    number of notes of each, and the result is the same as for the array
+    with every length repeated that many times.
+
+    Returns the percentiles keyed as ``p50``, ``p90`` and ``p99`` and the
+    histogram as bin edges and counts, or nothing for an empty array.
+    """
+
+    if weights is None:
+        weights = np.ones(len(lengths), dtype=np.int64)
+    present = weights > 0
+    lengths, weights = lengths[present], weights[present]
+
+    if not lengths.size:
+        return {}, None
+
+    order = np.argsort(lengths, kind="stable")
+    lengths, weights = lengths[order], weights[order]
+    cumulative = np.cumsum(weights)
+
+    # Linear interpolation between the closest ranks, as np.percentile does.
+    positions = (cumulative[-1] - 1) * np.asarray(PERCENTILES) / 100
+    lower = lengths[np.searchsorted(cumulative, np.floor(positions), side="right")]
+    upper = lengths[np.searchsorted(cumulative, np.ceil(positions), side="right")]
+    values = lower + (upper - lower) * (positions - np.floor(positions))
+    percentiles = {f"p{rank}": float(value) for rank, value in zip(PERCENTILES, values)}
+
+    counts, edges = np.histogram(lengths, bins=bins, weights=weights)
+
+    return percentiles, (edges.tolist(), counts.astype(np.int64).tolist())
@@ -0,0 +1,80 @@
+import asyncio
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterable, List, Optional
+
+from app.analytics import tokenizer
+from app.analytics.fold import AnalyticsFold
+from app.config import get_settings
+
+settings = get_settings()
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def fold_chunk(contents: List[str]) -> AnalyticsFold:
+    """Fold one chunk of note contents. Runs in a worker process."""
+
+    fold = AnalyticsFold()
+    fold.add(contents, tokenize=tokenizer.tokenize)
+    return fold
+
+
+def get_executor() -> Optional[ProcessPoolExecutor]:
+    """Process pool for analytics, created on first use.
+
+    ``None`` when ``ANALYTICS_WORKERS`` is 0, in which case chunks are
+    folded in a thread instead.
+    """
+
+    global _executor
+
+    if _executor is None and settings.ANALYTICS_WORKERS > 0:
+        # Spawned rather than forked: the server process has threads and
+        # open connections that a fork would copy.
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.ANALYTICS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+async def fold_partitions(partitions: AsyncIterable[List[str]]) -> AnalyticsFold:
+    """Fold chunks of note contents in parallel and merge the results.
+
+    Chunks are tokenized off the event loop, in worker processes when a
+    pool is configured. At most two chunks per worker are in flight, so a
+    fast reader does not pile the whole table up in memory. Partial folds
+    are merged in scan order, so ties between notes of the same length are
+    resolved as in a sequential scan.
+    """
+
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    max_in_flight = 2 * max(settings.ANALYTICS_WORKERS, 1)
+
+    fold = AnalyticsFold()
+    pending = deque()
+
+    try:
+        async for contents in partitions:
+            pending.append(loop.run_in_executor(executor, fold_chunk, list(contents)))
+            if len(pending) >= max_in_flight:
+                fold.merge(await pending.popleft())
+
+        while pending:
+            fold.merge(await pending.popleft())
+    finally:
+        for future in pending:
+            future.cancel()
+
+    return fold
+
+
+def close() -> None:
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
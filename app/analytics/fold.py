@@ -0,0 +1,87 @@
+import heapq
+from collections import Counter
+from typing import Callable, Iterable, List
+
+from app.schemas import note as schema
+
+EDGE_NOTES = 3
+
+
+class AnalyticsFold:
+    """Analytics folded over note contents one chunk at a time.
+
+    Only the counters and the few shortest and longest notes are kept, so a
+    scan needs memory for one chunk of contents plus the vocabulary. Folds
+    of different chunks or shards can be merged.
+    """
+
+    def __init__(self):
+        self.word_counts = Counter()
+        self.note_count = 0
+        self.total_words = 0
+        self.total_chars = 0
+        # Number of notes by number of words.
+        self.length_counts = Counter()
+        # Heaps of (length, sequence, content), with negated keys for the
+        # shortest notes. The sequence keeps ties in scan order.
+        self.shortest = []
+        self.longest = []
+
+    def _offer_shortest(self, length: int, sequence: int, content: str) -> None:
+        entry = (-length, -sequence, content)
+        if len(self.shortest) < EDGE_NOTES:
+            heapq.heappush(self.shortest, entry)
+        elif entry[:2] > self.shortest[0][:2]:
+            heapq.heapreplace(self.shortest, entry)
+
+    def _offer_longest(self, length: int, sequence: int, content: str) -> None:
+        entry = (length, sequence, content)
+        if len(self.longest) < EDGE_NOTES:
+            heapq.heappush(self.longest, entry)
+        elif entry[:2] > self.longest[0][:2]:
+            heapq.heapreplace(self.longest, entry)
+
+    def add(self, contents: Iterable[str], tokenize: Callable[[str], List[str]]) -> None:
+        for content in contents:
+            words = tokenize(content)
+            self.word_counts.update(words)
+            self.total_words += len(words)
+            self.length_counts[len(words)] += 1
+            self.total_chars += len(content)
+            self._offer_shortest(len(content), self.note_count, content)
+            self._offer_longest(len(content), self.note_count, content)
+            self.note_count += 1
+
+    def merge(self, other: "AnalyticsFold") -> "AnalyticsFold":
+        """Add ``other``, as if its notes were scanned after these ones."""
+
+        self.word_counts.update(other.word_counts)
+        self.total_words += other.total_words
+        self.length_counts.update(other.length_counts)
+        self.total_chars += other.total_chars
+
+        for length, sequence, content in other.shortest:
+            self._offer_shortest(-length, self.note_count - sequence, content)
+        for length, sequence, content in other.longest:
+            self._offer_longest(length, self.note_count + sequence, content)
+
+        self.note_count += other.note_count
+
+        return self
+
+    def response(self) -> schema.AnalyticsResponse:
+        if not self.note_count:
+            return schema.AnalyticsResponse(most_common_words=[])
+
+        shortest = sorted((-length, -sequence, content) for length, sequence, content in self.shortest)
+        longest = sorted(self.longest)
+
+        return schema.AnalyticsResponse(
+            total_words=self.total_words,
+            average_note_length=self.total_words / self.note_count,
+            note_count=self.note_count,
+            average_note_chars=self.total_chars / self.note_count,
+            most_common_words=self.word_counts.most_common(5),
+            shortest_notes=[content for _, _, content in shortest],
+            longest_notes=[content for _, _, content in longest],
+        )
@@ -0,0 +1,98 @@
+import re
+from typing import List
+
+# Characters and runs that nltk.word_tokenize always splits off as tokens of
+# their own. None of them is alphabetic, so they only separate chunks here.
+SEPARATORS = r"""\s«“‘„`»”’"?!;@#$%&*\[\](){}<>"""
+
+# Runs of anything but separators. Periods and hyphens are separators when
+# doubled; commas and colons are kept before a digit, as in "1,000".
+CHUNK_RE = re.compile(rf"""(?:[^{SEPARATORS}.:,\-]|(?<!\.)\.(?!\.)|(?<!-)-(?!-)|[:,](?=\d))+""")
+
+# Clitics that are split off the end of a word ("don't" -> "do", "n't").
+CLITICS = ("n't", "N'T", "'s", "'S", "'m", "'M", "'d", "'D", "'ll", "'LL", "'re", "'RE", "'ve", "'VE")
+
+# Words split after their third letter by the MacIntyre contractions.
+SPLIT_WORDS = frozenset({"cannot", "gimme", "gonna", "gotta", "lemme", "wanna"})
+SPLIT_WORDS_RE = re.compile("|".join(sorted(SPLIT_WORDS)), re.IGNORECASE)
+
+# Contractions with a quote inside, and the word nltk leaves of them.
+QUOTED_WORDS = {
+    "d'ye": (0, 1),
+    "more'n": (0, 4),
+    "'tis": (2, 4),
+    "'twas": (2, 5),
+}
+
+# Abbreviations the punkt sentence splitter keeps together with their period,
+# unless they end the text.
+ABBREVIATIONS = frozenset({"dr", "etc", "inc", "jr", "ltd", "mr", "mrs", "ms", "prof", "sr", "st", "vs"})
+
+
+def _split_word(word: str) -> List[str]:
+    if len(word) in (5, 6) and word.lower() in SPLIT_WORDS:
+        return [word[:3], word[3:]]
+    return [word]
+
+
+def _chunk_words(chunk: str) -> List[str]:
+    """Alphabetic tokens of a chunk that is not a plain word."""
+
+    if chunk[-1] == "." and len(chunk) > 1 and chunk[:-1].lower() not in ABBREVIATIONS:
+        chunk = chunk[:-1]
+        if chunk.isalpha():
+            return [chunk]
+
+    if "'" not in chunk:
+        return []
+
+    if chunk[-1] == "'" and len(chunk) > 1:
+        chunk = chunk[:-1]
+        if chunk[-1] == "." and len(chunk) > 1:
+            chunk = chunk[:-1]
+
+    for clitic in CLITICS:
+        if chunk.endswith(clitic) and len(chunk) > len(clitic) and chunk[-len(clitic) - 1] != "'":
+            chunk = chunk[:-len(clitic)]
+            break
+
+    quoted = QUOTED_WORDS.get(chunk.lower())
+    if quoted:
+        return [chunk[quoted[0]:quoted[1]]]
+
+    # A quote before a single letter, as in "'a", is split off.
+    if len(chunk) == 2 and chunk[0] == "'" and chunk[1].isalpha() and chunk[1] not in "mtsdnMTSDN":
+        return [chunk[1]]
+
+    if chunk.isalpha():
+        return [chunk]
+    return []
+
+
+def tokenize(text: str) -> List[str]:
+    """Alphabetic words of ``text``, as ``nltk.word_tokenize`` and an
+    ``isalpha`` filter would return them.
+
+    The text is split into chunks by one precompiled pattern and most chunks
+    are plain words that take the fast path. Sentence boundaries are not
+    detected, so a period that punkt would keep on a word it does not know
+    as an abbreviation is dropped here.
+    """
+
+    chunks = CHUNK_RE.findall(text)
+
+    words = []
+    for chunk in chunks:
+        if chunk.isalpha():
+            words.append(chunk)
+        else:
+            words.extend(_chunk_words(chunk))
+
+    # The period of an abbreviation that ends the text is split off too.
+    if chunks and chunks[-1][-1] == "." and chunks[-1][:-1].lower() in ABBREVIATIONS:
+        words.append(chunks[-1][:-1])
+
+    if SPLIT_WORDS_RE.search(text):
+        words = [part for word in words for part in _split_word(word)]
+
+    return words
@@ -1,6 +1,7 @@
 import os
 
 from functools import lru_cache
+from typing import Literal
 
 from dotenv import load_dotenv
 from pathlib import Path
@@ -28,6 +29,50 @@ class Settings(BaseSettings):
     SQLALCHEMY_DB_URL: str = f"{DB_DRIVER}://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
     GEMINI_API_KEY: str | None = os.getenv("GEMINI_API_KEY")
+    GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-1.5-pro-latest")
+
+    SUMMARY_BACKEND: str = os.getenv("SUMMARY_BACKEND", "gemini")
+    SUMMARY_FALLBACK_BACKEND: str | None = os.getenv("SUMMARY_FALLBACK_BACKEND")
+    SUMMARY_EXTRACTIVE_SENTENCES: int = int(os.getenv("SUMMARY_EXTRACTIVE_SENTENCES", 1))
+
+    SUMMARY_MAX_CONCURRENCY: int = int(os.getenv("SUMMARY_MAX_CONCURRENCY", 10))
+    SUMMARY_MIN_CONCURRENCY: int = int(os.getenv("SUMMARY_MIN_CONCURRENCY", 1))
+    SUMMARY_LATENCY_TARGET: float = float(os.getenv("SUMMARY_LATENCY_TARGET", 10))
+    SUMMARY_RATE_LIMIT: float = float(os.getenv("SUMMARY_RATE_LIMIT", 5))
+    SUMMARY_RATE_BURST: int = int(os.getenv("SUMMARY_RATE_BURST", 10))
+    SUMMARY_BREAKER_FAILURES: int = int(os.getenv("SUMMARY_BREAKER_FAILURES", 5))
+    SUMMARY_BREAKER_RESET: float = float(os.getenv("SUMMARY_BREAKER_RESET", 30))
+    SUMMARY_TIMEOUT: float = float(os.getenv("SUMMARY_TIMEOUT", 15))
+    SUMMARY_BATCH_MAX_CHARS: int = int(os.getenv("SUMMARY_BATCH_MAX_CHARS", 12000))
+    SUMMARY_BATCH_MAX_NOTES: int = int(os.getenv("SUMMARY_BATCH_MAX_NOTES", 20))
+    SUMMARY_BATCH_TIMEOUT: float = float(os.getenv("SUMMARY_BATCH_TIMEOUT", 60))
+    SUMMARY_CHUNK_CHARS: int = int(os.getenv("SUMMARY_CHUNK_CHARS", 8000))
+    SUMMARY_REDUCE_MAX_DEPTH: int = int(os.getenv("SUMMARY_REDUCE_MAX_DEPTH", 3))
+
+    SUMMARY_WORKERS: int = int(os.getenv("SUMMARY_WORKERS", 2))
+    SUMMARY_WORKER_BATCH_SIZE: int = int(os.getenv("SUMMARY_WORKER_BATCH_SIZE", 20))
+    SUMMARY_WORKER_POLL_INTERVAL: float = float(os.getenv("SUMMARY_WORKER_POLL_INTERVAL", 5))
+    SUMMARY_JOB_MAX_ATTEMPTS: int = int(os.getenv("SUMMARY_JOB_MAX_ATTEMPTS", 5))
+    SUMMARY_JOB_BACKOFF: float = float(os.getenv("SUMMARY_JOB_BACKOFF", 2))
+    SUMMARY_JOB_MAX_BACKOFF: float = float(os.getenv("SUMMARY_JOB_MAX_BACKOFF", 300))
+    SUMMARY_JOB_LEASE: float = float(os.getenv("SUMMARY_JOB_LEASE", 120))
+
+    NOTES_COUNT_STRATEGY: Literal["exact", "estimated", "maintained"] = os.getenv("NOTES_COUNT_STRATEGY", "exact")
+
+    SEARCH_BACKEND: Literal["postgres", "memory"] = os.getenv("SEARCH_BACKEND", "postgres")
+
+    SEARCH_INDEX_REFRESH: int = int(os.getenv("SEARCH_INDEX_REFRESH", 60))
+
+    SEMANTIC_VECTOR_DIM: int = int(os.getenv("SEMANTIC_VECTOR_DIM", 256))
+    SEMANTIC_INDEX_PATH: str = os.getenv("SEMANTIC_INDEX_PATH", "semantic_index")
+    SEMANTIC_INDEX_PROBES: int = int(os.getenv("SEMANTIC_INDEX_PROBES", 8))
+    SEMANTIC_INDEX_CHECK_INTERVAL: float = float(os.getenv("SEMANTIC_INDEX_CHECK_INTERVAL", 60))
+    SEMANTIC_INDEX_REBUILD_TAIL: int = int(os.getenv("SEMANTIC_INDEX_REBUILD_TAIL", 5000))
+    SEMANTIC_EXHAUSTIVE_LIMIT: int = int(os.getenv("SEMANTIC_EXHAUSTIVE_LIMIT", 20000))
+
+    ANALYTICS_SCAN_CHUNK_SIZE: int = int(os.getenv("ANALYTICS_SCAN_CHUNK_SIZE", 1000))
+    ANALYTICS_HISTOGRAM_BINS: int = int(os.getenv("ANALYTICS_HISTOGRAM_BINS", 20))
+    ANALYTICS_WORKERS: int = int(os.getenv("ANALYTICS_WORKERS", os.cpu_count() or 1))
 
 
 @lru_cache
@@ -0,0 +1,473 @@
+import random
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy import select, func, update, delete, text
+from sqlalchemy.dialects.postgresql import insert
+import numpy as np
+
+from app import metrics
+from app.analytics import engine, tokenizer
+from app.analytics.distribution import length_distribution
+from app.analytics.fold import AnalyticsFold
+from app.config import get_settings
+from app.schemas import note as schema
+from app.models.models import AnalyticsLengthCount, AnalyticsTotals, AnalyticsWordCount, DataVersion, Note
+
+settings = get_settings()
+
+NOTES_VERSION = "notes"
+
+# Rows of the counters that every note write updates: the totals, the data
+# version, the notes row count and the hourly edit rollup. A write updates
+# one shard picked at random, so concurrent writes rarely wait for the same
+# row lock, and reads sum the shards. Word and length counts are one row
+# per word and per length, so writes still wait for each other on the rows
+# of the words they share.
+COUNTER_SHARDS = 16
+
+# Rows per statement when writing word counts, well below the bind
+# parameter limit of the driver.
+WRITE_CHUNK_SIZE = 5000
+
+# Computed analytics of this process, with the data version they were
+# computed at.
+analytics_cache: Optional[Tuple[int, schema.AnalyticsResponse]] = None
+
+
+def counter_shard() -> int:
+    return random.randrange(COUNTER_SHARDS)
+
+
+def tokenize_words(text: str) -> List[str]:
+    return tokenizer.tokenize(text)
+
+
+def note_words(content: str | None) -> Optional[List[str]]:
+    """Words of a note, or ``None`` for a note that does not exist.
+
+    Writes tokenize the content once with this and pass the words on to
+    ``note_lengths``, ``apply_analytics_delta`` and
+    ``crud_semantic.note_embedding``.
+    """
+
+    return tokenize_words(content) if content is not None else None
+
+
+def note_lengths(content: str | None, words: Optional[List[str]] = None) -> dict:
+    """Values of the ``word_count`` and ``char_length`` columns of a note.
+
+    ``words`` are the words of ``content`` when the caller has them already.
+    """
+
+    if content is None:
+        return {"word_count": None, "char_length": None}
+
+    if words is None:
+        words = tokenize_words(content)
+    return {"word_count": len(words), "char_length": len(content)}
+
+
+def analytics_delta(
+        old_content: str | None,
+        new_content: str | None,
+        old_words: Optional[List[str]] = None,
+        new_words: Optional[List[str]] = None,
+) -> dict:
+    """What changing a note from ``old_content`` to ``new_content`` adds.
+
+    ``None`` stands for a note that does not exist, so creating a note is
+    ``(None, content)`` and deleting one is ``(content, None)``. The words of
+    either content are tokenized unless they are given.
+    """
+
+    if old_words is None:
+        old_words = note_words(old_content)
+    if new_words is None:
+        new_words = note_words(new_content)
+
+    old_words = Counter(old_words or ())
+    new_words = Counter(new_words or ())
+
+    words = dict(new_words)
+    for word, count in old_words.items():
+        words[word] = words.get(word, 0) - count
+
+    lengths = Counter()
+    if new_content is not None:
+        lengths[new_words.total()] += 1
+    if old_content is not None:
+        lengths[old_words.total()] -= 1
+
+    return {
+        "note_count": (new_content is not None) - (old_content is not None),
+        "total_words": new_words.total() - old_words.total(),
+        "total_chars": len(new_content or "") - len(old_content or ""),
+        "words": {word: count for word, count in words.items() if count},
+        "lengths": {length: count for length, count in lengths.items() if count},
+    }
+
+
+async def _write_word_counts(db: AsyncSession, words: dict) -> None:
+    # Sorted, so that concurrent writers lock shared words in the same order.
+    items = sorted(words.items())
+
+    for start in range(0, len(items), WRITE_CHUNK_SIZE):
+        insert_query = insert(AnalyticsWordCount).values([
+            {"word": word, "count": count}
+            for word, count in items[start:start + WRITE_CHUNK_SIZE]
+        ])
+        query = insert_query.on_conflict_do_update(
+            index_elements=[AnalyticsWordCount.word],
+            set_={"count": AnalyticsWordCount.count + insert_query.excluded.count},
+        )
+        await db.execute(query)
+
+
+async def _write_length_counts(db: AsyncSession, lengths: dict) -> None:
+    insert_query = insert(AnalyticsLengthCount).values([
+        {"word_count": length, "notes": count}
+        for length, count in sorted(lengths.items())
+    ])
+    await db.execute(
+        insert_query.on_conflict_do_update(
+            index_elements=[AnalyticsLengthCount.word_count],
+            set_={"notes": AnalyticsLengthCount.notes + insert_query.excluded.notes},
+        )
+    )
+
+
+async def apply_analytics_delta(
+        db: AsyncSession,
+        old_content: str | None,
+        new_content: str | None,
+        new_words: Optional[List[str]] = None,
+) -> None:
+    """Apply one note write to the aggregates, in the caller's transaction.
+
+    Nothing is recorded until the aggregates have been built once by
+    ``rebuild_analytics``; that rebuild counts every note anyway.
+    ``new_words`` are the words of ``new_content``, if already tokenized.
+    """
+
+    delta = analytics_delta(old_content, new_content, new_words=new_words)
+
+    totals_query = (
+        update(AnalyticsTotals)
+        .where(AnalyticsTotals.id == counter_shard())
+        .values(
+            note_count=AnalyticsTotals.note_count + delta["note_count"],
+            total_words=AnalyticsTotals.total_words + delta["total_words"],
+            total_chars=AnalyticsTotals.total_chars + delta["total_chars"],
+        )
+        .returning(AnalyticsTotals.id)
+    )
+
+    result = await db.execute(totals_query)
+    if result.scalar() is None:
+        return
+
+    if delta["lengths"]:
+        await _write_length_counts(db=db, lengths=delta["lengths"])
+        await db.execute(
+            delete(AnalyticsLengthCount)
+            .where(
+                AnalyticsLengthCount.word_count.in_(list(delta["lengths"])),
+                AnalyticsLengthCount.notes <= 0,
+            )
+        )
+
+    if not delta["words"]:
+        return
+
+    await _write_word_counts(db=db, words=delta["words"])
+
+    removed = [word for word, count in delta["words"].items() if count < 0]
+    if removed:
+        await db.execute(
+            delete(AnalyticsWordCount)
+            .where(
+                AnalyticsWordCount.word.in_(removed),
+                AnalyticsWordCount.count <= 0,
+            )
+        )
+
+
+async def bump_data_version(db: AsyncSession) -> Tuple[int, int]:
+    """Mark the notes as changed, in the transaction of the write.
+
+    The bump becomes visible with the write itself, so analytics cached at
+    a version never miss a write committed before it. Returns the shard
+    that was bumped and the version the write moved it to.
+    """
+
+    shard = counter_shard()
+    query = insert(DataVersion).values(name=NOTES_VERSION, shard=shard, version=1)
+    result = await db.execute(
+        query.on_conflict_do_update(
+            index_elements=[DataVersion.name, DataVersion.shard],
+            set_={"version": DataVersion.version + 1},
+        )
+        .returning(DataVersion.version)
+    )
+
+    return shard, result.scalar()
+
+
+async def get_data_version(db: AsyncSession) -> int:
+    """Sum of the shards of the version, which moves on with every write."""
+
+    query = select(func.sum(DataVersion.version)).where(DataVersion.name == NOTES_VERSION)
+
+    return int((await db.execute(query)).scalar() or 0)
+
+
+async def get_data_versions(db: AsyncSession) -> Dict[int, int]:
+    """Version of each shard, to tell which writes a cached value has seen."""
+
+    query = (
+        select(DataVersion.shard, DataVersion.version)
+        .where(DataVersion.name == NOTES_VERSION)
+    )
+
+    return {row.shard: row.version for row in (await db.execute(query)).all()}
+
+
+async def _edge_notes(db: AsyncSession) -> tuple[List[str], List[str]]:
+    """The three shortest and three longest notes.
+
+    Both queries walk ``ix_public_notes_char_length``, one from each end,
+    so only six note bodies are read.
+    """
+
+    shortest_query = (
+        select(Note.content)
+        .where(Note.char_length.is_not(None))
+        .order_by(Note.char_length, Note.id)
+        .limit(3)
+    )
+    longest_query = (
+        select(Note.content)
+        .where(Note.char_length.is_not(None))
+        .order_by(Note.char_length.desc(), Note.id.desc())
+        .limit(3)
+    )
+
+    shortest_notes = (await db.execute(shortest_query)).scalars().all()
+    longest_notes = (await db.execute(longest_query)).scalars().all()
+
+    return list(shortest_notes), list(reversed(longest_notes))
+
+
+async def load_length_counts(db: AsyncSession) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct note lengths in words and the number of notes of each.
+
+    Read from the aggregates, whose size is the number of distinct lengths
+    rather than the number of notes.
+    """
+
+    query = select(AnalyticsLengthCount.word_count, AnalyticsLengthCount.notes)
+    rows = (await db.execute(query)).all()
+
+    return (
+        np.array([row.word_count for row in rows], dtype=np.int64),
+        np.array([row.notes for row in rows], dtype=np.int64),
+    )
+
+
+def _add_length_distribution(
+        response: schema.AnalyticsResponse,
+        lengths: np.ndarray,
+        counts: np.ndarray,
+) -> schema.AnalyticsResponse:
+    percentiles, histogram = length_distribution(
+        lengths,
+        bins=settings.ANALYTICS_HISTOGRAM_BINS,
+        weights=counts,
+    )
+    response.length_percentiles = percentiles
+    if histogram is not None:
+        response.length_histogram = schema.LengthHistogram(bin_edges=histogram[0], counts=histogram[1])
+
+    return response
+
+
+def _fold_response(fold: AnalyticsFold) -> schema.AnalyticsResponse:
+    return _add_length_distribution(
+        fold.response(),
+        np.fromiter(fold.length_counts.keys(), dtype=np.int64, count=len(fold.length_counts)),
+        np.fromiter(fold.length_counts.values(), dtype=np.int64, count=len(fold.length_counts)),
+    )
+
+
+async def backfill_note_lengths(db: AsyncSession, batch_size: int) -> int:
+    """Fill in ``word_count`` and ``char_length`` of notes written before
+    they existed, ``batch_size`` notes per transaction. Returns the number
+    of notes updated.
+
+    The batch is locked while it is computed, so a note updated meanwhile
+    either waits for it or is left out, and its fresh lengths are kept.
+    """
+
+    updated = 0
+    last_id = 0
+
+    while True:
+        query = (
+            select(Note.id, Note.content)
+            .where(
+                Note.id > last_id,
+                Note.content.is_not(None),
+                Note.word_count.is_(None),
+            )
+            .order_by(Note.id)
+            .limit(batch_size)
+            .with_for_update()
+        )
+        rows = (await db.execute(query)).all()
+        if not rows:
+            return updated
+
+        await db.execute(
+            update(Note),
+            [{"id": note_id, **note_lengths(content)} for note_id, content in rows],
+        )
+        await db.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+async def scan_notes(db: AsyncSession) -> AnalyticsFold:
+    """Fold every note into an ``AnalyticsFold``.
+
+    Only the content column is streamed, through a server-side cursor, in
+    chunks of ``ANALYTICS_SCAN_CHUNK_SIZE`` rows. The chunks are tokenized
+    by the analytics engine across ``ANALYTICS_WORKERS`` processes, so the
+    event loop stays free and memory is bounded by the chunks in flight
+    plus the vocabulary.
+    """
+
+    query = (
+        select(Note.content)
+        .where(Note.content.is_not(None))
+        .execution_options(yield_per=settings.ANALYTICS_SCAN_CHUNK_SIZE)
+    )
+
+    result = await db.stream_scalars(query)
+
+    return await engine.fold_partitions(result.partitions())
+
+
+async def scan_notes_analytics(db: AsyncSession) -> schema.AnalyticsResponse:
+    """Compute analytics from the notes themselves instead of the aggregates."""
+
+    fold = await scan_notes(db)
+
+    return _fold_response(fold)
+
+
+async def rebuild_analytics(db: AsyncSession) -> None:
+    """Rebuild the aggregates from a full scan of the notes.
+
+    Note writes are blocked until the rebuild commits, so that none of them
+    is counted twice or missed.
+    """
+
+    await db.execute(text("LOCK TABLE public.notes IN SHARE MODE"))
+
+    fold = await scan_notes(db)
+
+    await db.execute(delete(AnalyticsWordCount))
+    await _write_word_counts(db=db, words=fold.word_counts)
+    await db.execute(delete(AnalyticsLengthCount))
+    if fold.length_counts:
+        await _write_length_counts(db=db, lengths=fold.length_counts)
+    await bump_data_version(db=db)
+
+    # Every shard gets a row, the first one with the totals.
+    await db.execute(delete(AnalyticsTotals))
+    await db.execute(
+        insert(AnalyticsTotals).values([
+            {
+                "id": shard,
+                "note_count": fold.note_count if shard == 0 else 0,
+                "total_words": fold.total_words if shard == 0 else 0,
+                "total_chars": fold.total_chars if shard == 0 else 0,
+                "rebuilt_at": func.now(),
+            }
+            for shard in range(COUNTER_SHARDS)
+        ])
+    )
+
+    await db.commit()
+
+
+async def get_notes_analytics(db: AsyncSession) -> schema.AnalyticsResponse:
+    """Analytics, recomputed only when the notes changed.
+
+    The result is cached with the data version read before computing it, so
+    repeated calls cost a single version lookup until the next write. A
+    write committed while computing leaves a result older than its version,
+    which is never served again.
+    """
+
+    global analytics_cache
+
+    version = await get_data_version(db)
+
+    if analytics_cache is not None and analytics_cache[0] == version:
+        metrics.increment("analytics_cache_hits")
+        return analytics_cache[1]
+
+    metrics.increment("analytics_cache_misses")
+
+    response = await exact_notes_analytics(db)
+    analytics_cache = (version, response)
+
+    return response
+
+
+async def exact_notes_analytics(db: AsyncSession) -> schema.AnalyticsResponse:
+    """Analytics read from the aggregates, in constant time.
+
+    Falls back to a full scan until the aggregates have been built.
+    """
+
+    totals_query = select(
+        func.count(AnalyticsTotals.id).label("shards"),
+        func.sum(AnalyticsTotals.note_count).label("note_count"),
+        func.sum(AnalyticsTotals.total_words).label("total_words"),
+        func.sum(AnalyticsTotals.total_chars).label("total_chars"),
+    )
+    totals = (await db.execute(totals_query)).one()
+
+    if not totals.shards:
+        return await scan_notes_analytics(db)
+
+    # Sums of bigint columns come back as numeric.
+    note_count, total_words, total_chars = int(totals.note_count), int(totals.total_words), int(totals.total_chars)
+    if not note_count:
+        return schema.AnalyticsResponse(most_common_words=[])
+
+    words_query = (
+        select(AnalyticsWordCount.word, AnalyticsWordCount.count)
+        .order_by(AnalyticsWordCount.count.desc(), AnalyticsWordCount.word)
+        .limit(5)
+    )
+    most_common_words = [tuple(row) for row in (await db.execute(words_query)).all()]
+
+    shortest_notes, longest_notes = await _edge_notes(db)
+
+    response = schema.AnalyticsResponse(
+        total_words=total_words,
+        average_note_length=total_words / note_count,
+        note_count=note_count,
+        average_note_chars=total_chars / note_count,
+        most_common_words=most_common_words,
+        shortest_notes=shortest_notes,
+        longest_notes=longest_notes,
+    )
+
+    return _add_length_distribution(response, *await load_length_counts(db))
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.crud import crud_analytics
+from app.schemas import edits as schema
+from app.models.models import EditRollup, Note, NoteEditRollup
+
+
+async def record_edit(db: AsyncSession, note_id: int) -> None:
+    """Count a new version of a note in the hourly rollups.
+
+    Runs in the transaction that inserts the note history row, so the
+    rollups use the same ``now()`` as its ``updated_at``. The rollup of all
+    notes is sharded like the other counters and summed by the reads.
+    """
+
+    hour = func.date_trunc("hour", func.now())
+
+    query = insert(EditRollup).values(hour=hour, shard=crud_analytics.counter_shard(), edits=1)
+    await db.execute(
+        query.on_conflict_do_update(
+            index_elements=[EditRollup.hour, EditRollup.shard],
+            set_={"edits": EditRollup.edits + 1},
+        )
+    )
+
+    note_query = insert(NoteEditRollup).values(hour=hour, note_id=note_id, edits=1)
+    await db.execute(
+        note_query.on_conflict_do_update(
+            index_elements=[NoteEditRollup.hour, NoteEditRollup.note_id],
+            set_={"edits": NoteEditRollup.edits + 1},
+        )
+    )
+
+
+def _naive(moment: datetime) -> datetime:
+    # History timestamps are stored without a time zone; aware bounds are
+    # compared in UTC.
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _in_range(query, hour, start: Optional[datetime], end: Optional[datetime]):
+    """Limit a rollup query to the hours that overlap ``[start, end)``."""
+
+    if start is not None:
+        query = query.where(hour >= _naive(start).replace(minute=0, second=0, microsecond=0))
+    if end is not None:
+        query = query.where(hour < _naive(end))
+    return query
+
+
+async def get_edit_counts(
+        db: AsyncSession,
+        interval: schema.EditInterval,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        note_id: Optional[int] = None,
+) -> schema.EditCountsResponse:
+    """Versions written per hour or day, of all notes or of one note.
+
+    Read from the hourly rollups, so the cost depends on the length of the
+    range and not on the size of the history. Ranges are widened to whole
+    hours.
+    """
+
+    rollup = EditRollup if note_id is None else NoteEditRollup
+    bucket = func.date_trunc(interval.value, rollup.hour).label("bucket")
+
+    query = select(bucket, func.sum(rollup.edits)).group_by(bucket).order_by(bucket)
+    if note_id is not None:
+        query = query.where(NoteEditRollup.note_id == note_id)
+    query = _in_range(query, rollup.hour, start, end)
+
+    buckets = [
+        schema.EditBucket(bucket=row[0], edits=int(row[1]))
+        for row in (await db.execute(query)).all()
+    ]
+
+    return schema.EditCountsResponse(
+        interval=interval,
+        total_edits=sum(item.edits for item in buckets),
+        buckets=buckets,
+    )
+
+
+async def get_most_edited(
+        db: AsyncSession,
+        limit: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+) -> schema.MostEditedResponse:
+    edits = func.sum(NoteEditRollup.edits).label("edits")
+
+    query = (
+        select(NoteEditRollup.note_id, Note.title, edits)
+        .join(Note, Note.id == NoteEditRollup.note_id)
+        .group_by(NoteEditRollup.note_id, Note.title)
+        .order_by(edits.desc(), NoteEditRollup.note_id)
+        .limit(limit)
+    )
+    query = _in_range(query, NoteEditRollup.hour, start, end)
+
+    notes = [
+        schema.NoteEdits(note_id=row[0], title=row[1], edits=int(row[2]))
+        for row in (await db.execute(query)).all()
+    ]
+
+    return schema.MostEditedResponse(notes=notes)
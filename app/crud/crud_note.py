@@ -1,16 +1,42 @@
-from collections import Counter
+import base64
+import json
 from typing import List
 
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio.session import AsyncSession
-from sqlalchemy import select, func, update, delete
+from sqlalchemy import select, func, update, delete, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import joinedload
-import nltk
-import numpy as np
 
 from app.schemas import note as schema
-from app.models.models import Note, NoteHistory
+from app.config import get_settings
+from app.models.models import Note, NoteHistory, RowCount
 from app.ai_service import ai_service
+from app.crud import crud_analytics, crud_edits, crud_search, crud_semantic, crud_summary
+from app.workers import summary_worker
+
+settings = get_settings()
+
+NOTES_ROW_COUNT = "notes"
+
+# Fields that can be requested with ``fields=``; the id is always returned.
+LIST_FIELDS = ("id", "version", "title", "content")
+DETAIL_FIELDS = LIST_FIELDS + ("history",)
+
+
+def parse_fields(fields: str, allowed: tuple) -> set:
+    """Names of a comma-separated ``fields`` parameter, with the id."""
+
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+
+    unknown = names.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}",
+        )
+
+    return names | {"id"}
 
 
 async def get_note(
@@ -49,10 +75,63 @@ async def check_note(
     return True
 
 
+async def _get_content_for_update(
+        db: AsyncSession,
+        note_id: int,
+) -> str | None:
+
+    query = select(Note.content).where(Note.id == note_id).with_for_update()
+    result = await db.execute(query)
+
+    return result.scalar()
+
+
+async def _get_partial_note(
+        db: AsyncSession,
+        note_id: int,
+        fields: set,
+) -> schema.PartialDetailResponseNote | None:
+
+    columns = [getattr(Note, name) for name in LIST_FIELDS if name in fields]
+
+    result = await db.execute(select(*columns).where(Note.id == note_id))
+    note_data = result.first()
+
+    if note_data is None:
+        return None
+
+    note = schema.PartialDetailResponseNote(
+        **{name: getattr(note_data, name) for name in LIST_FIELDS if name in fields}
+    )
+
+    if "history" in fields:
+        history_query = (
+            select(NoteHistory.id, NoteHistory.version, NoteHistory.content, NoteHistory.updated_at)
+            .where(NoteHistory.note_id == note_id)
+            .order_by(NoteHistory.version)
+        )
+        note.history = [
+            schema.ResponseNoteHistory(
+                id=item.id,
+                version=item.version,
+                content=item.content,
+                updated_at=item.updated_at,
+            )
+            for item in (await db.execute(history_query)).all()
+        ]
+
+    return note
+
+
 async def get_note_with_history(
         db: AsyncSession,
         note_id: int,
-) -> schema.DetailResponseNote | None:
+        fields: set | None = None,
+) -> schema.DetailResponseNote | schema.PartialDetailResponseNote | None:
+    """A note with its history, or only the columns named in ``fields``."""
+
+    if fields is not None:
+        return await _get_partial_note(db=db, note_id=note_id, fields=fields)
 
     query = (
         select(Note)
@@ -94,12 +173,26 @@ async def create_note(
 
     try:
 
+        words = crud_analytics.note_words(note_data.content)
         note = Note(
             title=note_data.title,
             content=note_data.content,
+            **crud_analytics.note_lengths(note_data.content, words),
+            **crud_semantic.note_embedding(note_data.content, words),
         )
 
         db.add(note)
+        # The id is needed for the summary job, which commits with the note.
+        await db.flush()
+        crud_summary.enqueue_summary_job(db=db, note_id=note.id, note_content=note.content)
+        await _add_to_note_count(db=db, delta=1)
+        await crud_analytics.apply_analytics_delta(
+            db=db,
+            old_content=None,
+            new_content=note.content,
+            new_words=words,
+        )
+        data_version = await crud_analytics.bump_data_version(db=db)
         await db.commit()
         await db.refresh(note)
 
@@ -110,7 +203,10 @@ async def create_note(
         )
 
         db.add(note_history)
+        await crud_edits.record_edit(db=db, note_id=note.id)
         await db.commit()
+        summary_worker.notify()
+        crud_search.index_note(note.id, note.title, note.content, data_version)
 
         note_response = schema.ResponseNote(
             id=note.id,
@@ -126,36 +222,206 @@ async def create_note(
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+def _list_note(item) -> schema.ListResponseNote:
+    """List entry with the stored summary, when the note has one."""
+
+    if item.summary is None:
+        return schema.ListResponseNote(
+            id=item.id,
+            version=item.version,
+            title=item.title,
+            content=item.content,
+            summary_stale=None,
+        )
+
+    return schema.ListResponseNote(
+        id=item.id,
+        version=item.version,
+        title=item.title,
+        content=item.summary,
+        summary_stale=item.summary_content_hash != ai_service.content_hash(item.content),
+    )
+
+
+async def _add_to_note_count(db: AsyncSession, delta: int) -> None:
+    query = insert(RowCount).values(name=NOTES_ROW_COUNT, shard=crud_analytics.counter_shard(), count=delta)
+    await db.execute(
+        query.on_conflict_do_update(
+            index_elements=[RowCount.name, RowCount.shard],
+            set_={"count": RowCount.count + delta},
+        )
+    )
+
+
+async def count_notes(db: AsyncSession) -> int:
+    """Number of notes, as ``NOTES_COUNT_STRATEGY`` gets it.
+
+    exact - ``count(*)``, a full scan of the table.
+    estimated - the planner statistics in ``pg_class``, as fresh as the
+    last vacuum or analyze.
+    maintained - the sum of the counter shards that ``create_note`` and
+    ``delete_note`` update in their transactions.
+
+    The last two fall back to an exact count while they have no value.
+    """
+
+    strategy = settings.NOTES_COUNT_STRATEGY
+
+    if strategy == "estimated":
+        query = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'public.notes'::regclass")
+        estimate = (await db.execute(query)).scalar()
+        if estimate is not None and estimate >= 0:
+            return estimate
+
+    elif strategy == "maintained":
+        query = select(func.sum(RowCount.count)).where(RowCount.name == NOTES_ROW_COUNT)
+        count = (await db.execute(query)).scalar()
+        if count is not None:
+            return int(count)
+
+    return (await db.execute(select(func.count(Note.id)))).scalar()
+
+
+def encode_token(data: dict) -> str:
+    """Opaque, URL-safe form of a cursor."""
+
+    token = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(token).rstrip(b"=").decode()
+
+
+def decode_token(cursor: str) -> dict:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return data
+
+
+def encode_cursor(note_id: int) -> str:
+    return encode_token({"id": note_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    """Id of the last note of the previous page, from an ``after`` token."""
+
+    note_id = decode_token(cursor).get("id")
+
+    if not isinstance(note_id, int) or isinstance(note_id, bool):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return note_id
+
+
+def _partial_list_note(item, fields: set) -> schema.PartialListResponseNote:
+    """List entry with only ``fields``, and the stored summary as content
+    when the note has one."""
+
+    note = schema.PartialListResponseNote(**{name: getattr(item, name) for name in fields})
+
+    if "content" in fields:
+        note.summary_stale = None
+        if getattr(item, "summary", None) is not None:
+            note.content = item.summary
+            note.summary_stale = item.summary_content_hash != ai_service.content_hash(item.content)
+
+    return note
+
+
 async def get_notes(
         db: AsyncSession,
         limit: int = 10,
         offset: int = 0,
+        summary_mode: schema.SummaryMode = schema.SummaryMode.cached,
+        after: int | None = None,
+        with_count: bool = True,
+        fields: set | None = None,
 ):
+    """A page of notes in id order.
+
+    With ``after`` the page starts right after that note id, seeking
+    through the primary key, so every page costs the same however deep it
+    is. Otherwise ``offset`` rows are skipped. Either way the response has a
+    cursor for the next page when there is one. ``count_items`` is left out
+    when ``with_count`` is false, see ``count_notes``.
+
+    With ``fields`` only those columns are selected and returned, and the
+    summaries are only looked at when content is one of them.
+    """
+
+    with_content = fields is None or "content" in fields
+
+    if fields is None:
+        columns = [Note.id, Note.version, Note.title, Note.content]
+    else:
+        columns = [getattr(Note, name) for name in LIST_FIELDS if name in fields]
+    if with_content and summary_mode != schema.SummaryMode.none:
+        columns += [Note.summary, Note.summary_content_hash]
 
     query = (
-        select(Note)
-        .limit(limit)
-        .offset(offset)
+        select(*columns)
+        .order_by(Note.id)
+        .limit(limit + 1)
     )
-    count_query = select(func.count(Note.id))
+    if after is not None:
+        query = query.where(Note.id > after)
+    else:
+        query = query.offset(offset)
 
     result = await db.execute(query)
-    notes_data = result.scalars().all()
+    notes_data = result.all()
+
+    next_cursor = None
+    if len(notes_data) > limit:
+        notes_data = notes_data[:limit]
+        next_cursor = encode_cursor(notes_data[-1].id)
 
-    count_result = await db.execute(count_query)
-    count = count_result.scalar()
+    count = await count_notes(db) if with_count else None
 
-    notes_response = schema.ResponseNotes(
-        notes=[
-            schema.ResponseNote(
+    if fields is not None:
+        notes = [_partial_list_note(item, fields) for item in notes_data]
+    elif summary_mode == schema.SummaryMode.none:
+        notes = [
+            schema.ListResponseNote(
                 id=item.id,
                 version=item.version,
                 title=item.title,
-                content= await ai_service.get_summarize_note(item.content),
+                content=item.content,
+                summary_stale=None,
             )
             for item in notes_data
-        ],
+        ]
+    else:
+        notes = [_list_note(item) for item in notes_data]
+
+    if summary_mode == schema.SummaryMode.fresh and with_content:
+        outdated = [
+            index for index, note in enumerate(notes)
+            if note.summary_stale is not False
+        ]
+        summaries = await crud_summary.get_summaries(
+            db=db,
+            notes_content=[notes_data[index].content for index in outdated],
+        )
+
+        for index, summary in zip(outdated, summaries):
+            if summary is not None:
+                notes[index].content = summary
+                notes[index].summary_stale = False
+            else:
+                notes[index].content = await ai_service.fallback_summary(notes_data[index].content)
+                notes[index].summary_stale = None
+
+    response_schema = schema.ResponseNotes if fields is None else schema.PartialResponseNotes
+
+    notes_response = response_schema(
+        notes=notes,
         count_items=count,
+        summary_mode=summary_mode,
+        next_cursor=next_cursor,
     )
 
     return notes_response
@@ -169,12 +435,17 @@ async def update_note(
 
     try:
         try:
+            old_content = await _get_content_for_update(db=db, note_id=note_id)
+            words = crud_analytics.note_words(update_data.content)
+
             note_query = (
                 update(Note)
                 .where(Note.id == note_id)
                 .values(
                     content=update_data.content,
                     version=Note.version + 1,
+                    **crud_analytics.note_lengths(update_data.content, words),
+                    **crud_semantic.note_embedding(update_data.content, words),
                 )
                 .returning(Note.version)
             )
@@ -194,10 +465,24 @@ async def update_note(
         )
 
         db.add(note_history)
+        await crud_edits.record_edit(db=db, note_id=note_id)
+        crud_summary.enqueue_summary_job(db=db, note_id=note_id, note_content=update_data.content)
+        data_version = None
+        if old_content is not None:
+            await crud_analytics.apply_analytics_delta(
+                db=db,
+                old_content=old_content,
+                new_content=update_data.content,
+                new_words=words,
+            )
+            data_version = await crud_analytics.bump_data_version(db=db)
 
         await db.commit()
+        summary_worker.notify()
 
         new_note = await get_note(db=db, note_id=note_id)
+        if new_note is not None:
+            crud_search.index_note(new_note.id, new_note.title, new_note.content, data_version)
 
         return new_note
 
@@ -210,9 +495,18 @@ async def delete_note(db: AsyncSession, note_id: int) -> bool:
 
     try:
 
+        old_content = await _get_content_for_update(db=db, note_id=note_id)
+
         delete_query = delete(Note).where(Note.id == note_id)
-        await db.execute(delete_query)
+        result = await db.execute(delete_query)
+        if result.rowcount:
+            await _add_to_note_count(db=db, delta=-1)
+        data_version = None
+        if old_content is not None:
+            await crud_analytics.apply_analytics_delta(db=db, old_content=old_content, new_content=None)
+            data_version = await crud_analytics.bump_data_version(db=db)
         await db.commit()
+        crud_search.unindex_note(note_id, data_version)
 
         return True
 
@@ -261,19 +555,37 @@ async def roll_back_note(
         history_result = await db.execute(get_history_query)
         history = history_result.scalar()
 
+        old_content = await _get_content_for_update(db=db, note_id=note_id)
+        words = crud_analytics.note_words(history.content)
+
         update_note_query = (
             update(Note)
             .where(Note.id == note_id)
             .values(
                 content=history.content,
                 version=history.version,
+                **crud_analytics.note_lengths(history.content, words),
+                **crud_semantic.note_embedding(history.content, words),
             )
         )
 
         await db.execute(update_note_query)
+        crud_summary.enqueue_summary_job(db=db, note_id=note_id, note_content=history.content)
+        data_version = None
+        if old_content is not None:
+            await crud_analytics.apply_analytics_delta(
+                db=db,
+                old_content=old_content,
+                new_content=history.content,
+                new_words=words,
+            )
+            data_version = await crud_analytics.bump_data_version(db=db)
         await db.commit()
+        summary_worker.notify()
 
         new_note = await get_note(db=db, note_id=note_id)
+        if new_note is not None:
+            crud_search.index_note(new_note.id, new_note.title, new_note.content, data_version)
 
         return new_note
 
@@ -283,40 +595,5 @@ async def roll_back_note(
 
 
 async def get_notes_analytics(db: AsyncSession):
-    query = select(Note)
-    result = await db.execute(query)
-    notes = result.scalars().all()
-
-    if not notes:
-        return schema.AnalyticsResponse()
-
-    texts = [note.content for note in notes]
-
-    all_text = " ".join(texts)
-
-    words = nltk.word_tokenize(all_text)
-
-    filtered_words = [word for word in words if word.isalpha()]
-
-    total_words = len(filtered_words)
-
-    note_lengths = [len([word for word in nltk.word_tokenize(text) if word.isalpha()]) for text in texts]
-    avg_length = np.mean(note_lengths)
-
-    word_counts = Counter(filtered_words)
-    most_common_words = word_counts.most_common(5)
-
-    sorted_notes = sorted(notes, key=lambda note: len(note.content))
-
-    shortest_notes = [note.content for note in sorted_notes[:3]]
-    longest_notes = [note.content for note in sorted_notes[-3:]]
-
-    response = schema.AnalyticsResponse(
-        total_words=total_words,
-        average_note_length=avg_length,
-        most_common_words=most_common_words,
-        shortest_notes=shortest_notes,
-        longest_notes=longest_notes,
-    )
 
-    return response
+    return await crud_analytics.get_notes_analytics(db=db)
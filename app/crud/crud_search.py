@@ -0,0 +1,229 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy import select, func, tuple_
+
+from app.config import get_settings
+from app.crud import crud_analytics, crud_note
+from app.schemas import note as schema
+from app.search.inverted_index import InvertedIndex
+from app.models.models import Note
+
+settings = get_settings()
+
+# Text search configuration of Note.search_vector.
+SEARCH_CONFIG = "english"
+
+# Inverted index of this process for the memory backend, with the version
+# of each data version shard it is up to date with and the time those were
+# last checked.
+memory_index: Optional[Tuple[Dict[int, int], float, InvertedIndex]] = None
+
+# Held while the memory index is checked or rebuilt, so concurrent searches
+# wait for one rebuild instead of each running their own.
+memory_index_lock = asyncio.Lock()
+
+
+def encode_search_cursor(rank: float, note_id: int) -> str:
+    return crud_note.encode_token({"rank": rank, "id": note_id})
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    """Rank and id of the last note of the previous page of results."""
+
+    data = crud_note.decode_token(cursor)
+    rank, note_id = data.get("rank"), data.get("id")
+
+    if (
+            not isinstance(rank, (int, float)) or isinstance(rank, bool)
+            or not isinstance(note_id, int) or isinstance(note_id, bool)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return float(rank), note_id
+
+
+async def _search_postgres(
+        db: AsyncSession,
+        query: str,
+        limit: int,
+        after: Optional[Tuple[float, int]],
+) -> List[schema.SearchResultNote]:
+
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    rank = func.ts_rank(Note.search_vector, ts_query)
+
+    search_query = (
+        select(Note.id, Note.version, Note.title, Note.content, rank.label("rank"))
+        .where(Note.search_vector.op("@@")(ts_query))
+        .order_by(rank.desc(), Note.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        search_query = search_query.where(tuple_(rank, Note.id) < tuple_(*after))
+
+    result = await db.execute(search_query)
+
+    return [
+        schema.SearchResultNote(
+            id=item.id,
+            version=item.version,
+            title=item.title,
+            content=item.content,
+            rank=item.rank,
+        )
+        for item in result.all()
+    ]
+
+
+async def get_memory_index(db: AsyncSession) -> InvertedIndex:
+    """Inverted index of all notes.
+
+    Writes of this process are applied to it as they are committed, along
+    with the data version they moved on, see ``index_note``. Writes of other
+    processes move the data version on, and pick up a full rebuild at most
+    once every ``SEARCH_INDEX_REFRESH`` seconds.
+    """
+
+    global memory_index
+
+    if memory_index is not None and time.monotonic() - memory_index[1] < settings.SEARCH_INDEX_REFRESH:
+        return memory_index[2]
+
+    async with memory_index_lock:
+        # Checked or rebuilt by another search while this one waited.
+        if memory_index is not None and time.monotonic() - memory_index[1] < settings.SEARCH_INDEX_REFRESH:
+            return memory_index[2]
+
+        checked_at = time.monotonic()
+        versions = await crud_analytics.get_data_versions(db)
+        if memory_index is not None and memory_index[0] == versions:
+            memory_index = (memory_index[0], checked_at, memory_index[2])
+            return memory_index[2]
+
+        index = InvertedIndex()
+        result = await db.stream(
+            select(Note.id, Note.title, Note.content)
+            .execution_options(yield_per=settings.ANALYTICS_SCAN_CHUNK_SIZE)
+        )
+        async for rows in result.partitions():
+            for row in rows:
+                index.add(row.id, row.title, row.content)
+
+        memory_index = (versions, checked_at, index)
+        return index
+
+
+def _advance_version(data_version: Optional[Tuple[int, int]]) -> None:
+    """Count a write of this process, which moved a shard of the data
+    version to ``data_version``, as applied to the memory index.
+
+    Only done when the index was at the version just before it; otherwise
+    writes of other processes came in between and are left to a rebuild.
+    """
+
+    if data_version is None:
+        return
+
+    shard, version = data_version
+    versions = memory_index[0]
+    if versions.get(shard, 0) == version - 1:
+        versions[shard] = version
+
+
+def index_note(
+        note_id: int,
+        title: Optional[str],
+        content: Optional[str],
+        data_version: Optional[Tuple[int, int]] = None,
+) -> None:
+    """Apply a committed create or update to the memory index, if built.
+
+    ``data_version`` is what ``crud_analytics.bump_data_version`` returned
+    for the write.
+    """
+
+    if memory_index is not None:
+        memory_index[2].add(note_id, title, content)
+        _advance_version(data_version)
+
+
+def unindex_note(note_id: int, data_version: Optional[Tuple[int, int]] = None) -> None:
+    """Apply a committed delete to the memory index, if built."""
+
+    if memory_index is not None:
+        memory_index[2].remove(note_id)
+        _advance_version(data_version)
+
+
+async def _search_memory(
+        db: AsyncSession,
+        query: str,
+        limit: int,
+        after: Optional[Tuple[float, int]],
+) -> List[schema.SearchResultNote]:
+    """Best ``limit`` notes of the memory index that still exist.
+
+    Notes deleted by other processes stay in the index until it is rebuilt,
+    so the index is read on past them until the page is full.
+    """
+
+    index = await get_memory_index(db)
+
+    notes = []
+    while len(notes) < limit:
+        hits = index.search(query, limit=limit - len(notes), after=after)
+        if not hits:
+            break
+
+        result = await db.execute(
+            select(Note.id, Note.version, Note.title, Note.content)
+            .where(Note.id.in_([note_id for _, note_id in hits]))
+        )
+        rows = {item.id: item for item in result.all()}
+
+        notes.extend(
+            schema.SearchResultNote(
+                id=note_id,
+                version=rows[note_id].version,
+                title=rows[note_id].title,
+                content=rows[note_id].content,
+                rank=rank,
+            )
+            for rank, note_id in hits
+            if note_id in rows
+        )
+        after = hits[-1]
+
+    return notes
+
+
+async def search_notes(
+        db: AsyncSession,
+        query: str,
+        limit: int = 10,
+        after: Optional[Tuple[float, int]] = None,
+) -> schema.SearchResponse:
+    """Notes matching ``query`` in their title or content, best first.
+
+    With the ``postgres`` backend the query is parsed by
+    ``websearch_to_tsquery`` and matched against the generated search vector
+    through its GIN index. The ``memory`` backend ranks the notes with an
+    in-process inverted index instead, for databases without text search.
+    Pages continue after the rank and id of ``after``.
+    """
+
+    if settings.SEARCH_BACKEND == "postgres":
+        notes = await _search_postgres(db=db, query=query, limit=limit + 1, after=after)
+    else:
+        notes = await _search_memory(db=db, query=query, limit=limit + 1, after=after)
+
+    next_cursor = None
+    if len(notes) > limit:
+        notes = notes[:limit]
+        next_cursor = encode_search_cursor(notes[-1].rank, notes[-1].id)
+
+    return schema.SearchResponse(notes=notes, next_cursor=next_cursor)
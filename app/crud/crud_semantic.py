@@ -0,0 +1,282 @@
+import asyncio
+import functools
+import logging
+import os
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy import select, func, update
+
+from app.config import get_settings
+from app.search.vectors import IVFIndex, embed, embed_terms, top_k
+from app.schemas import note as schema
+from app.models.models import Note
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# Nearest neighbour index of this process, see load_index.
+semantic_index: Optional[IVFIndex] = None
+
+
+def embed_note(content: str | None, words: Optional[List[str]] = None) -> Optional[np.ndarray]:
+    if words is not None:
+        return embed_terms((word.lower() for word in words), dim=settings.SEMANTIC_VECTOR_DIM)
+    return embed(content, dim=settings.SEMANTIC_VECTOR_DIM)
+
+
+def note_embedding(content: str | None, words: Optional[List[str]] = None) -> dict:
+    """Column values of the vector of a note with this content.
+
+    ``words`` are the words of ``content`` as ``crud_analytics.note_words``
+    tokenizes them, when the caller has them already.
+    """
+
+    vector = embed_note(content, words)
+    return {"embedding": vector.tobytes() if vector is not None else None}
+
+
+def _vector(embedding: bytes) -> np.ndarray:
+    return np.frombuffer(embedding, dtype=np.float32)
+
+
+def _has_vector():
+    """Notes with a stored vector of ``SEMANTIC_VECTOR_DIM`` dimensions.
+
+    Vectors computed with another dimension are left out until they are
+    computed again.
+    """
+
+    return func.length(Note.embedding) == settings.SEMANTIC_VECTOR_DIM * np.dtype(np.float32).itemsize
+
+
+def load_index() -> None:
+    """Memory-map the index saved at ``SEMANTIC_INDEX_PATH``, if there is one.
+
+    Without an index the newest ``SEMANTIC_EXHAUSTIVE_LIMIT`` notes are
+    compared with the query until ``refresh_index`` has built one.
+    """
+
+    global semantic_index
+
+    path = settings.SEMANTIC_INDEX_PATH
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        logger.info("No semantic index at %s, building one in the background", path)
+        semantic_index = None
+        return
+
+    index = IVFIndex.load(path)
+    if index.dim != settings.SEMANTIC_VECTOR_DIM:
+        logger.warning("Semantic index at %s has %s dimensions, expected %s", path, index.dim, settings.SEMANTIC_VECTOR_DIM)
+        semantic_index = None
+        return
+
+    semantic_index = index
+
+
+async def backfill_embeddings(db: AsyncSession, batch_size: int) -> int:
+    """Compute the vectors of notes that have none, ``batch_size`` notes
+    per transaction. Returns the number of notes updated.
+
+    The batch is locked while it is computed, so a note updated meanwhile
+    either waits for it or is left out, and its fresh vector is kept.
+    """
+
+    updated = 0
+    last_id = 0
+
+    while True:
+        query = (
+            select(Note.id, Note.content)
+            .where(
+                Note.id > last_id,
+                Note.content.is_not(None),
+                Note.embedding.is_(None),
+            )
+            .order_by(Note.id)
+            .limit(batch_size)
+            .with_for_update()
+        )
+        rows = (await db.execute(query)).all()
+        if not rows:
+            return updated
+
+        await db.execute(
+            update(Note),
+            [{"id": note_id, **note_embedding(content)} for note_id, content in rows],
+        )
+        await db.commit()
+
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+async def build_index(db: AsyncSession) -> Optional[IVFIndex]:
+    """Build an index of the stored vectors of all notes, or ``None`` when
+    no note has one yet."""
+
+    max_id = (await db.execute(select(func.max(Note.id)))).scalar() or 0
+    where = (Note.id <= max_id, _has_vector())
+
+    count = (await db.execute(select(func.count()).select_from(Note).where(*where))).scalar()
+    ids = np.empty(count, dtype=np.int64)
+    vectors = np.empty((count, settings.SEMANTIC_VECTOR_DIM), dtype=np.float32)
+
+    # Notes can get a vector between the count and the scan, those are
+    # left for the next build.
+    filled = 0
+    result = await db.stream(
+        select(Note.id, Note.embedding)
+        .where(*where)
+        .execution_options(yield_per=settings.ANALYTICS_SCAN_CHUNK_SIZE)
+    )
+    async for rows in result.partitions():
+        for row in rows[:count - filled]:
+            ids[filled] = row.id
+            vectors[filled] = _vector(row.embedding)
+            filled += 1
+
+    if not filled:
+        return None
+
+    # Clustering is CPU bound, so it runs off the event loop.
+    return await asyncio.get_running_loop().run_in_executor(
+        None,
+        functools.partial(IVFIndex.build, ids=ids[:filled], vectors=vectors[:filled], max_id=max_id),
+    )
+
+
+async def refresh_index(db: AsyncSession) -> bool:
+    """Build the index of this process when there is none, or when at least
+    ``SEMANTIC_INDEX_REBUILD_TAIL`` notes with a vector were added after it.
+    Returns whether a new index was built.
+
+    Run by the semantic index worker, so searches never build it. The index
+    is kept in memory; ``build_semantic_index`` writes one that processes
+    share.
+    """
+
+    global semantic_index
+
+    if semantic_index is not None:
+        added = (
+            select(Note.id)
+            .where(Note.id > semantic_index.max_id, _has_vector())
+            .limit(settings.SEMANTIC_INDEX_REBUILD_TAIL)
+            .subquery()
+        )
+        count = (await db.execute(select(func.count()).select_from(added))).scalar()
+        if count < settings.SEMANTIC_INDEX_REBUILD_TAIL:
+            return False
+
+    index = await build_index(db)
+    if index is None:
+        return False
+
+    semantic_index = index
+    return True
+
+
+async def _nearest(
+        db: AsyncSession,
+        query: np.ndarray,
+        limit: int,
+        exclude: Optional[int] = None,
+) -> List[schema.SimilarNote]:
+    """Notes closest to ``query`` by cosine similarity.
+
+    Candidates come from the index, plus the newest notes added after it
+    was built, at most ``SEMANTIC_EXHAUSTIVE_LIMIT`` of them; older ones
+    are found once the index is rebuilt. All of them are scored with their
+    current vectors, so notes updated since the build are ranked by their
+    new content and deleted ones drop out. Only the ``limit`` best notes
+    are read in full.
+    """
+
+    candidates = []
+    max_id = 0
+    if semantic_index is not None:
+        ids, _ = semantic_index.search(query, k=limit + 1, probes=settings.SEMANTIC_INDEX_PROBES)
+        candidates = ids.tolist()
+        max_id = semantic_index.max_id
+
+    columns = (Note.id, Note.embedding)
+    queries = [
+        select(*columns)
+        .where(Note.id > max_id, _has_vector())
+        .order_by(Note.id.desc())
+        .limit(settings.SEMANTIC_EXHAUSTIVE_LIMIT)
+        .execution_options(yield_per=settings.ANALYTICS_SCAN_CHUNK_SIZE)
+    ]
+    if candidates:
+        queries.append(select(*columns).where(Note.id.in_(candidates), _has_vector()))
+
+    ids = []
+    scores = []
+    for vectors_query in queries:
+        result = await db.stream(vectors_query)
+        async for partition in result.partitions():
+            rows = [row for row in partition if row.id != exclude]
+            if rows:
+                ids.extend(row.id for row in rows)
+                scores.append(np.vstack([_vector(row.embedding) for row in rows]) @ query)
+
+    if not ids:
+        return []
+
+    scores = np.concatenate(scores)
+    best = [(ids[position], float(scores[position])) for position in top_k(scores, limit)]
+
+    result = await db.execute(
+        select(Note.id, Note.version, Note.title, Note.content)
+        .where(Note.id.in_([note_id for note_id, _ in best]))
+    )
+    notes = {item.id: item for item in result.all()}
+
+    return [
+        schema.SimilarNote(
+            id=note_id,
+            version=notes[note_id].version,
+            title=notes[note_id].title,
+            content=notes[note_id].content,
+            score=score,
+        )
+        for note_id, score in best
+        if note_id in notes
+    ]
+
+
+async def semantic_search(db: AsyncSession, query: str, limit: int = 10) -> schema.SimilarNotesResponse:
+    """Notes whose content is closest in meaning to ``query``."""
+
+    vector = embed_note(query)
+    if vector is None:
+        return schema.SimilarNotesResponse(notes=[])
+
+    notes = await _nearest(db=db, query=vector, limit=limit)
+
+    return schema.SimilarNotesResponse(notes=notes)
+
+
+async def get_similar_notes(
+        db: AsyncSession,
+        note_id: int,
+        limit: int = 10,
+) -> schema.SimilarNotesResponse | None:
+    """Notes closest to a note, without the note itself. ``None`` when the
+    note does not exist."""
+
+    result = await db.execute(select(Note.id, Note.embedding).where(Note.id == note_id))
+    note = result.first()
+
+    if note is None:
+        return None
+
+    if note.embedding is None or len(_vector(note.embedding)) != settings.SEMANTIC_VECTOR_DIM:
+        return schema.SimilarNotesResponse(notes=[])
+
+    notes = await _nearest(db=db, query=_vector(note.embedding), limit=limit, exclude=note_id)
+
+    return schema.SimilarNotesResponse(notes=notes)
@@ -0,0 +1,266 @@
+import random
+from datetime import timedelta
+from typing import AsyncIterator, Dict, Iterable, List, Tuple
+
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy import select, func, update, case
+from sqlalchemy.dialects.postgresql import insert
+
+from app import metrics
+from app.config import get_settings
+from app.database import async_session_maker
+from app.models.models import Note, NoteSummary, SummaryJob
+from app.ai_service import ai_service
+
+settings = get_settings()
+
+
+async def get_cached_summaries(
+        db: AsyncSession,
+        content_hashes: Iterable[str],
+) -> Dict[str, str]:
+
+    content_hashes = set(content_hashes)
+    if not content_hashes:
+        return {}
+
+    query = (
+        select(NoteSummary.content_hash, NoteSummary.summary)
+        .where(
+            NoteSummary.content_hash.in_(content_hashes),
+            NoteSummary.model_id == ai_service.MODEL_ID,
+            NoteSummary.prompt_version == ai_service.PROMPT_VERSION,
+        )
+    )
+
+    result = await db.execute(query)
+
+    return {content_hash: summary for content_hash, summary in result.all()}
+
+
+async def save_summaries(
+        db: AsyncSession,
+        summaries: Dict[str, str],
+) -> None:
+
+    if not summaries:
+        return
+
+    query = (
+        insert(NoteSummary)
+        .values([
+            {
+                "content_hash": content_hash,
+                "model_id": ai_service.MODEL_ID,
+                "prompt_version": ai_service.PROMPT_VERSION,
+                "summary": summary,
+            }
+            for content_hash, summary in summaries.items()
+        ])
+        .on_conflict_do_nothing()
+    )
+
+    await db.execute(query)
+    await db.commit()
+
+
+def _record_lookup(hits: int, misses: int) -> None:
+    metrics.increment("summary_cache_hits", hits)
+    metrics.increment("summary_cache_misses", misses)
+
+    total = metrics.counters["summary_cache_hits"] + metrics.counters["summary_cache_misses"]
+    if total:
+        metrics.set_gauge("summary_cache_hit_rate", metrics.counters["summary_cache_hits"] / total)
+
+
+async def get_summaries(
+        db: AsyncSession,
+        notes_content: List[str],
+) -> List[str | None]:
+    """Return a summary for every note, in order.
+
+    Summaries are looked up by content hash first. Only the misses are sent
+    to the model, and the successful ones are stored for the next request.
+    Notes that could not be summarized get ``None``.
+    """
+
+    hashes = [ai_service.content_hash(content) for content in notes_content]
+    summaries = await get_cached_summaries(db=db, content_hashes=hashes)
+
+    missing = {
+        content_hash: content
+        for content_hash, content in zip(hashes, notes_content)
+        if content_hash not in summaries
+    }
+
+    misses = sum(1 for content_hash in hashes if content_hash in missing)
+    _record_lookup(hits=len(hashes) - misses, misses=misses)
+
+    if missing:
+        results = await ai_service.try_summarize_batch(list(missing.values()))
+        new_summaries = {
+            content_hash: summary
+            for content_hash, summary in zip(missing, results)
+            if summary is not None
+        }
+
+        await save_summaries(db=db, summaries=new_summaries)
+        summaries.update(new_summaries)
+
+    return [summaries.get(content_hash) for content_hash in hashes]
+
+
+async def stream_summary(note_content: str) -> AsyncIterator[Tuple[str, dict]]:
+    """Summary events of one note, served from the summary cache if possible.
+
+    Runs outside of the request session, as events are produced after the
+    endpoint has returned. A summary that needed no fallback is cached.
+    """
+
+    note_hash = ai_service.content_hash(note_content)
+
+    async with async_session_maker() as db:
+        cached = await get_cached_summaries(db=db, content_hashes=[note_hash])
+
+    _record_lookup(hits=len(cached), misses=1 - len(cached))
+
+    if cached:
+        yield "summary", {"summary": cached[note_hash], "fallback": False}
+        return
+
+    async for event, data in ai_service.map_reduce_summary(note_content):
+        if event == "summary" and not data["fallback"]:
+            async with async_session_maker() as db:
+                await save_summaries(db=db, summaries={note_hash: data["summary"]})
+
+        yield event, data
+
+
+def enqueue_summary_job(
+        db: AsyncSession,
+        note_id: int,
+        note_content: str,
+) -> None:
+    """Add a summary job to the session.
+
+    The caller commits it together with the note write, so a job exists for
+    every committed version of the content.
+    """
+
+    db.add(
+        SummaryJob(
+            note_id=note_id,
+            content_hash=ai_service.content_hash(note_content),
+        )
+    )
+
+
+async def claim_summary_jobs(
+        db: AsyncSession,
+        limit: int,
+) -> List[SummaryJob]:
+    """Lease up to ``limit`` due jobs to the calling worker.
+
+    Running jobs whose lease has expired are claimed again, so jobs held by
+    a worker that died are picked up after a restart. An expired job that
+    has used up ``SUMMARY_JOB_MAX_ATTEMPTS`` is failed instead, so a note
+    that crashes or hangs the worker is not leased forever.
+    """
+
+    due_jobs = (
+        select(SummaryJob.id)
+        .where(
+            SummaryJob.status.in_((SummaryJob.PENDING, SummaryJob.RUNNING)),
+            SummaryJob.available_at <= func.now(),
+        )
+        .order_by(SummaryJob.available_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+    exhausted = SummaryJob.attempts >= settings.SUMMARY_JOB_MAX_ATTEMPTS
+
+    query = (
+        update(SummaryJob)
+        .where(SummaryJob.id.in_(due_jobs.scalar_subquery()))
+        .values(
+            status=case((exhausted, SummaryJob.FAILED), else_=SummaryJob.RUNNING),
+            attempts=case((exhausted, SummaryJob.attempts), else_=SummaryJob.attempts + 1),
+            last_error=case((exhausted, "Lease expired on the last attempt"), else_=SummaryJob.last_error),
+            available_at=func.now() + timedelta(seconds=settings.SUMMARY_JOB_LEASE),
+        )
+        .returning(SummaryJob)
+        .execution_options(synchronize_session=False)
+    )
+
+    result = await db.execute(query)
+    jobs = [job for job in result.scalars().all() if job.status == SummaryJob.RUNNING]
+    await db.commit()
+
+    return jobs
+
+
+async def complete_summary_job(
+        db: AsyncSession,
+        job: SummaryJob,
+        summary: str | None,
+) -> None:
+    """Store ``summary`` on the note and close the job.
+
+    The note row is locked and its content re-hashed first, so a summary of
+    an older version never overwrites the summary of a newer one.
+    """
+
+    if summary is not None:
+        query = (
+            select(Note.content)
+            .where(Note.id == job.note_id)
+            .with_for_update()
+        )
+        result = await db.execute(query)
+        content = result.scalar()
+
+        if content is not None and ai_service.content_hash(content) == job.content_hash:
+            await db.execute(
+                update(Note)
+                .where(Note.id == job.note_id)
+                .values(
+                    summary=summary,
+                    summary_content_hash=job.content_hash,
+                )
+            )
+
+    await db.execute(
+        update(SummaryJob)
+        .where(SummaryJob.id == job.id)
+        .values(status=SummaryJob.DONE, last_error=None)
+    )
+    await db.commit()
+
+
+async def retry_summary_job(
+        db: AsyncSession,
+        job: SummaryJob,
+        error: str,
+) -> None:
+    """Put the job back with exponential backoff, or fail it for good."""
+
+    if job.attempts >= settings.SUMMARY_JOB_MAX_ATTEMPTS:
+        values = {"status": SummaryJob.FAILED, "last_error": error}
+    else:
+        backoff = min(
+            settings.SUMMARY_JOB_BACKOFF * 2 ** (job.attempts - 1),
+            settings.SUMMARY_JOB_MAX_BACKOFF,
+        )
+        values = {
+            "status": SummaryJob.PENDING,
+            "last_error": error,
+            "available_at": func.now() + timedelta(seconds=backoff * random.uniform(0.5, 1.5)),
+        }
+
+    await db.execute(
+        update(SummaryJob)
+        .where(SummaryJob.id == job.id)
+        .values(**values)
+    )
+    await db.commit()
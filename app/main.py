@@ -2,7 +2,12 @@ import logging
 
 from fastapi import FastAPI
 
+from app.ai_service import ai_service
+from app.analytics import engine as analytics_engine
+from app.crud import crud_semantic
+from app.routers.metrics import metrics_router
 from app.routers.note import note_router
+from app.workers import semantic_index_worker, summary_worker
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +26,7 @@ def create_application() -> FastAPI:
     )
 
     app.include_router(note_router, prefix="/notes", tags=["Notes"])
+    app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
 
     return app
 
@@ -31,6 +37,9 @@ async def startup():
     message = "🟢Starting up application🟢"
     logger.info(message)
     print(message)
+    summary_worker.start_workers()
+    crud_semantic.load_index()
+    semantic_index_worker.start_worker()
 
 
 @app.on_event("shutdown")
@@ -38,6 +47,10 @@ async def shutdown():
     message = "🔴Shutting down application🔴"
     logger.info(message)
     print(message)
+    await summary_worker.stop_workers()
+    await semantic_index_worker.stop_worker()
+    ai_service.close()
+    analytics_engine.close()
 
 
 @app.get("/")
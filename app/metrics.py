@@ -0,0 +1,20 @@
+from collections import Counter
+
+# Process-local metrics. Every uvicorn worker keeps its own values.
+counters: Counter = Counter()
+gauges: dict[str, float] = {}
+
+
+def increment(name: str, value: int = 1) -> None:
+    counters[name] += value
+
+
+def set_gauge(name: str, value: float) -> None:
+    gauges[name] = value
+
+
+def snapshot() -> dict:
+    return {
+        "counters": dict(counters),
+        "gauges": dict(gauges),
+    }
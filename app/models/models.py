@@ -1,7 +1,8 @@
 from datetime import datetime
 
 import sqlalchemy as sa
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.database import Base
 
@@ -9,6 +10,7 @@ from app.database import Base
 class NoteHistory(Base):
     __tablename__ = "note_histories"
     __table_args__ = (
+        sa.Index("ix_public_note_histories_updated_at_note_id", "updated_at", "note_id"),
         {
             "schema": "public",
         }
@@ -38,5 +40,188 @@ class Note(Base):
     title = sa.Column(sa.String, index=True)
     content = sa.Column(sa.Text)
     version = sa.Column(sa.Integer, default=1)
+    summary = sa.Column(sa.Text)
+    summary_content_hash = sa.Column(sa.String(64))
+    # Filled in on every write, see crud_analytics.note_lengths.
+    word_count = sa.Column(sa.Integer)
+    char_length = sa.Column(sa.Integer)
+    # Kept up to date by PostgreSQL; deferred so that loading a note does not
+    # load its vector.
+    search_vector = deferred(sa.Column(
+        TSVECTOR,
+        sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+    # Float32 vector of the content, see crud_semantic.note_embedding.
+    embedding = deferred(sa.Column(sa.LargeBinary))
 
     histories = relationship("NoteHistory", back_populates="note")
+
+
+# Serves the shortest and longest notes of the analytics from the index
+# alone, in both directions.
+sa.Index(
+    "ix_public_notes_char_length",
+    Note.char_length,
+    Note.id,
+    postgresql_where=Note.char_length.is_not(None),
+)
+
+sa.Index(
+    "ix_public_notes_search_vector",
+    Note.search_vector,
+    postgresql_using="gin",
+)
+
+
+class NoteSummary(Base):
+    __tablename__ = "note_summaries"
+    __table_args__ = (
+        {
+            "schema": "public",
+        }
+    )
+
+    content_hash = sa.Column(sa.String(64), primary_key=True)
+    model_id = sa.Column(sa.String, primary_key=True)
+    prompt_version = sa.Column(sa.String, primary_key=True)
+    summary = sa.Column(sa.Text, nullable=False)
+    created_at = sa.Column(sa.DateTime, default=sa.func.now())
+
+
+class SummaryJob(Base):
+    __tablename__ = "summary_jobs"
+    __table_args__ = (
+        sa.Index("ix_public_summary_jobs_status_available_at", "status", "available_at"),
+        {
+            "schema": "public",
+        }
+    )
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    id = sa.Column(sa.Integer, primary_key=True, index=True)
+    note_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("public.notes.id", ondelete="CASCADE"),
+        index=True,
+    )
+    content_hash = sa.Column(sa.String(64), nullable=False)
+    status = sa.Column(sa.String, nullable=False, default=PENDING)
+    attempts = sa.Column(sa.Integer, nullable=False, default=0)
+    last_error = sa.Column(sa.Text)
+    available_at = sa.Column(sa.DateTime, nullable=False, default=sa.func.now())
+    created_at = sa.Column(sa.DateTime, default=sa.func.now())
+    updated_at = sa.Column(sa.DateTime, default=sa.func.now(), onupdate=sa.func.now())
+
+
+class AnalyticsTotals(Base):
+    __tablename__ = "analytics_totals"
+    __table_args__ = (
+        {
+            "schema": "public",
+        }
+    )
+
+    # One row per counter shard, summed on read, see
+    # crud_analytics.COUNTER_SHARDS.
+    id = sa.Column(sa.Integer, primary_key=True)
+    note_count = sa.Column(sa.BigInteger, nullable=False, default=0)
+    total_words = sa.Column(sa.BigInteger, nullable=False, default=0)
+    total_chars = sa.Column(sa.BigInteger, nullable=False, default=0)
+    rebuilt_at = sa.Column(sa.DateTime, default=sa.func.now())
+
+
+class AnalyticsWordCount(Base):
+    __tablename__ = "analytics_word_counts"
+    __table_args__ = (
+        {
+            "schema": "public",
+        }
+    )
+
+    word = sa.Column(sa.String, primary_key=True)
+    count = sa.Column(sa.BigInteger, nullable=False, index=True)
+
+
+class AnalyticsLengthCount(Base):
+    __tablename__ = "analytics_length_counts"
+    __table_args__ = (
+        {
+            "schema": "public",
+        }
+    )
+
+    # Number of notes with each number of words, for the length percentiles
+    # and histogram.
+    word_count = sa.Column(sa.Integer, primary_key=True)
+    notes = sa.Column(sa.BigInteger, nullable=False)
+
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+    __table_args__ = (
+        {
+            "schema": "public",
+        }
+    )
+
+    # Bumped in the same transaction as every write to the data it names,
+    # on one of its shards, see crud_analytics.bump_data_version.
+    name = sa.Column(sa.String, primary_key=True)
+    shard = sa.Column(sa.Integer, primary_key=True, default=0)
+    version = sa.Column(sa.BigInteger, nullable=False, default=0)
+
+
+class EditRollup(Base):
+    __tablename__ = "edit_rollups"
+    __table_args__ = (
+        {
+            "schema": "public",
+        }
+    )
+
+    # Versions written per hour, maintained with every note history row on
+    # one of its shards, see crud_edits.record_edit.
+    hour = sa.Column(sa.DateTime, primary_key=True)
+    shard = sa.Column(sa.Integer, primary_key=True, default=0)
+    edits = sa.Column(sa.BigInteger, nullable=False, default=0)
+
+
+class NoteEditRollup(Base):
+    __tablename__ = "note_edit_rollups"
+    __table_args__ = (
+        sa.Index("ix_public_note_edit_rollups_note_id_hour", "note_id", "hour"),
+        {
+            "schema": "public",
+        }
+    )
+
+    hour = sa.Column(sa.DateTime, primary_key=True)
+    note_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("public.notes.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    edits = sa.Column(sa.BigInteger, nullable=False, default=0)
+
+
+class RowCount(Base):
+    __tablename__ = "row_counts"
+    __table_args__ = (
+        {
+            "schema": "public",
+        }
+    )
+
+    # Maintained by the writes that insert or delete rows of the table it
+    # names, on one of its shards, see crud_note.count_notes.
+    name = sa.Column(sa.String, primary_key=True)
+    shard = sa.Column(sa.Integer, primary_key=True, default=0)
+    count = sa.Column(sa.BigInteger, nullable=False, default=0)
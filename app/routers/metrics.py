@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from app import metrics
+from app.schemas import metrics as schema
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    path="",
+    name="Get metrics",
+    response_model=schema.MetricsResponse,
+)
+async def get_metrics():
+
+    return metrics.snapshot()
@@ -1,12 +1,16 @@
+import json
+from datetime import datetime
 from typing import Annotated, List
 
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from fastapi import APIRouter, Depends, status, Query, Path
 from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
 
+from app.schemas import edits as edits_schema
 from app.schemas import note as schema
 from app.database import get_db
-from app.crud import crud_note
+from app.crud import crud_edits, crud_note, crud_search, crud_semantic, crud_summary
 
 note_router = APIRouter()
 
@@ -27,6 +31,91 @@ async def get_analytics(
     return result
 
 
+@note_router.get(
+    path="/analytics/edits",
+    name="Get edit counts",
+    response_model=edits_schema.EditCountsResponse,
+)
+async def get_edit_counts(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        interval: edits_schema.EditInterval = Query(edits_schema.EditInterval.hour),
+        start: datetime | None = Query(None, description="Start of the range, inclusive"),
+        end: datetime | None = Query(None, description="End of the range, exclusive"),
+):
+
+    result = await crud_edits.get_edit_counts(
+        db=db,
+        interval=interval,
+        start=start,
+        end=end,
+    )
+
+    return result
+
+
+@note_router.get(
+    path="/analytics/most-edited",
+    name="Get most edited notes",
+    response_model=edits_schema.MostEditedResponse,
+)
+async def get_most_edited(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        limit: int = Query(10, ge=1, le=100),
+        start: datetime | None = Query(None, description="Start of the range, inclusive"),
+        end: datetime | None = Query(None, description="End of the range, exclusive"),
+):
+
+    result = await crud_edits.get_most_edited(
+        db=db,
+        limit=limit,
+        start=start,
+        end=end,
+    )
+
+    return result
+
+
+@note_router.get(
+    path="/search",
+    name="Search notes",
+    response_model=schema.SearchResponse,
+)
+async def search_notes(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        q: str = Query(..., min_length=1, max_length=1000, description="Words to search for in titles and contents"),
+        size: int = Query(10, ge=1, le=100),
+        after: str | None = Query(
+            None,
+            description="next_cursor of the previous page of results",
+        ),
+):
+
+    result = await crud_search.search_notes(
+        db=db,
+        query=q,
+        limit=size,
+        after=crud_search.decode_search_cursor(after) if after is not None else None,
+    )
+
+    return result
+
+
+@note_router.get(
+    path="/semantic-search",
+    name="Search notes by meaning",
+    response_model=schema.SimilarNotesResponse,
+)
+async def semantic_search(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        q: str = Query(..., min_length=1, max_length=10000, description="Text to find notes similar to"),
+        size: int = Query(10, ge=1, le=100),
+):
+
+    result = await crud_semantic.semantic_search(db=db, query=q, limit=size)
+
+    return result
+
+
 @note_router.post(
     path="",
     name="Create note",
@@ -51,20 +140,47 @@ async def create_note(
 @note_router.get(
     path="",
     name="Get notes",
-    response_model=schema.ResponseNotes,
+    # Notes with only the requested fields when fields is given; unset
+    # fields are left out of either response.
+    response_model=schema.ResponseNotes | schema.PartialResponseNotes,
+    response_model_exclude_unset=True,
 )
 async def get_notes(
         db: Annotated[AsyncSession, Depends(get_db)],
         page: int = Query(1, ge=1),
         size: int = Query(10, ge=1, le=1000),
+        summary: schema.SummaryMode = Query(
+            schema.SummaryMode.cached,
+            description=(
+                "none - skip summaries, cached - stored summaries without "
+                "calling the model, fresh - summarize outdated notes now"
+            ),
+        ),
+        after: str | None = Query(
+            None,
+            description="next_cursor of the previous page; page is ignored when given",
+        ),
+        count: bool = Query(
+            True,
+            description="Set to false to skip counting the notes; count_items is then null",
+        ),
+        fields: str | None = Query(
+            None,
+            description="Comma-separated note fields to return, of id, version, title and content",
+        ),
 ):
 
     offset = (page - 1) * size
+    selected = crud_note.parse_fields(fields, crud_note.LIST_FIELDS) if fields is not None else None
 
     result = await crud_note.get_notes(
         db=db,
         limit=size,
         offset=offset,
+        summary_mode=summary,
+        after=crud_note.decode_cursor(after) if after is not None else None,
+        with_count=count,
+        fields=selected,
     )
 
     return result
@@ -148,6 +264,53 @@ async def get_note_history(
     return result
 
 
+@note_router.get(
+    path="/{note_id}/edits",
+    name="Get note edit counts",
+    response_model=edits_schema.EditCountsResponse,
+)
+async def get_note_edit_counts(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        note_id: int = Path(..., title="Note ID", description="ID of the note"),
+        interval: edits_schema.EditInterval = Query(edits_schema.EditInterval.day),
+        start: datetime | None = Query(None, description="Start of the range, inclusive"),
+        end: datetime | None = Query(None, description="End of the range, exclusive"),
+):
+
+    note = await crud_note.check_note(db=db, note_id=note_id)
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+
+    result = await crud_edits.get_edit_counts(
+        db=db,
+        interval=interval,
+        start=start,
+        end=end,
+        note_id=note_id,
+    )
+
+    return result
+
+
+@note_router.get(
+    path="/{note_id}/similar",
+    name="Get similar notes",
+    response_model=schema.SimilarNotesResponse,
+)
+async def get_similar_notes(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        note_id: int = Path(..., title="Note ID", description="ID of the note"),
+        size: int = Query(10, ge=1, le=100),
+):
+
+    result = await crud_semantic.get_similar_notes(db=db, note_id=note_id, limit=size)
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+
+    return result
+
+
 @note_router.put(
     path="/{note_id}/rollback",
     name="Rollback note to some version",
@@ -182,17 +345,54 @@ async def rollback_note(
         )
 
 
+@note_router.get(
+    path="/{note_id}/summary",
+    name="Stream note summary",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_note_summary(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        note_id: int = Path(..., title="Note ID", description="ID of the note"),
+):
+
+    note = await crud_note.get_note(db=db, note_id=note_id)
+
+    if note is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note not found",
+        )
+
+    async def events():
+        async for event, data in crud_summary.stream_summary(note.content):
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @note_router.get(
     path="/{note_id}",
     name="Get detail info about note",
-    response_model=schema.DetailResponseNote,
+    response_model=schema.DetailResponseNote | schema.PartialDetailResponseNote,
+    response_model_exclude_unset=True,
 )
 async def get_note_detail(
         db: Annotated[AsyncSession, Depends(get_db)],
         note_id: int = Path(..., title="Note ID", description="ID of the note"),
+        fields: str | None = Query(
+            None,
+            description="Comma-separated fields to return, of id, version, title, content and history",
+        ),
 ):
 
-    result = await crud_note.get_note_with_history(db=db, note_id=note_id)
+    selected = crud_note.parse_fields(fields, crud_note.DETAIL_FIELDS) if fields is not None else None
+
+    result = await crud_note.get_note_with_history(db=db, note_id=note_id, fields=selected)
 
     if not result is None:
         return result
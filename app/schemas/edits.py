@@ -0,0 +1,67 @@
+from datetime import datetime
+from enum import Enum
+from typing import List
+
+from pydantic import Field
+
+from app.schemas.note import Base
+
+
+class EditInterval(str, Enum):
+    hour = "hour"
+    day = "day"
+
+
+class EditBucket(Base):
+    bucket: datetime = Field(
+        ...,
+        description="Start of the hour or day",
+        example="2026-10-18T14:00:00",
+    )
+    edits: int = Field(
+        ...,
+        description="The number of versions written in the bucket",
+        example=12,
+    )
+
+
+class EditCountsResponse(Base):
+    interval: EditInterval = Field(
+        ...,
+        description="The size of the buckets",
+        example=EditInterval.hour,
+    )
+    total_edits: int = Field(
+        ...,
+        description="The number of versions written in the range",
+        example=40,
+    )
+    buckets: List[EditBucket] = Field(
+        ...,
+        description="Buckets with at least one edit, oldest first",
+    )
+
+
+class NoteEdits(Base):
+    note_id: int = Field(
+        ...,
+        description="The id of the note",
+        example=1,
+    )
+    title: str | None = Field(
+        default=None,
+        description="The title of the note",
+        example="Note-1",
+    )
+    edits: int = Field(
+        ...,
+        description="The number of versions written in the range",
+        example=7,
+    )
+
+
+class MostEditedResponse(Base):
+    notes: List[NoteEdits] = Field(
+        ...,
+        description="Notes with the most versions in the range, most edited first",
+    )
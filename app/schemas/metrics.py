@@ -0,0 +1,18 @@
+from typing import Dict
+
+from pydantic import Field
+
+from app.schemas.note import Base
+
+
+class MetricsResponse(Base):
+    counters: Dict[str, int] = Field(
+        ...,
+        description="Monotonic counters of the current worker",
+        example={"summary_cache_hits": 120, "summary_cache_misses": 30},
+    )
+    gauges: Dict[str, float] = Field(
+        ...,
+        description="Point-in-time values of the current worker",
+        example={"summary_cache_hit_rate": 0.8},
+    )
@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import List
+from enum import Enum
+from typing import Dict, List
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -38,16 +39,118 @@ class ResponseNote(Note):
     )
 
 
+class ListResponseNote(ResponseNote):
+    summary_stale: bool | None = Field(
+        default=None,
+        description=(
+            "Whether content holds a summary of an older version of the note. "
+            "None when no summary is available and content is the raw note"
+        ),
+        example=False,
+    )
+
+
+class SummaryMode(str, Enum):
+    none = "none"
+    cached = "cached"
+    fresh = "fresh"
+
+
 class ResponseNotes(Base):
-    notes: List[ResponseNote] = Field(
+    notes: List[ListResponseNote] = Field(
         ...,
-        description="List with ResponseNote instances",
+        description="List with ListResponseNote instances",
     )
-    count_items: int = Field(
+    count_items: int | None = Field(
         ...,
-        description="The count of items in database",
+        description="The count of items in database, None when the count was skipped",
         example=56,
     )
+    summary_mode: SummaryMode = Field(
+        default=SummaryMode.cached,
+        description=(
+            "How content was filled: none - raw content, cached - stored "
+            "summaries where available, fresh - summaries of the current content"
+        ),
+        example=SummaryMode.cached,
+    )
+    next_cursor: str | None = Field(
+        default=None,
+        description="Token to pass as after for the next page, None on the last page",
+        example="eyJpZCI6MTB9",
+    )
+
+
+class PartialNote(Base):
+    id: int = Field(
+        ...,
+        description="The id of the note",
+        example=1,
+    )
+    version: int | None = Field(
+        default=None,
+        description="The version of the note",
+        example=3,
+    )
+    title: str | None = Field(
+        default=None,
+        description="The title of the note",
+        example="Note-1",
+    )
+    content: str | None = Field(
+        default=None,
+        description="The content of the note",
+        example="Test note for test task",
+    )
+
+
+class PartialListResponseNote(PartialNote):
+    summary_stale: bool | None = Field(
+        default=None,
+        description="As in ListResponseNote, returned with content",
+        example=False,
+    )
+
+
+class PartialResponseNotes(ResponseNotes):
+    notes: List[PartialListResponseNote] = Field(
+        ...,
+        description="Notes with only the requested fields",
+    )
+
+
+class SearchResultNote(ResponseNote):
+    rank: float = Field(
+        ...,
+        description="Relevance of the note to the query, higher is better",
+        example=0.6,
+    )
+
+
+class SearchResponse(Base):
+    notes: List[SearchResultNote] = Field(
+        ...,
+        description="Matching notes, best first",
+    )
+    next_cursor: str | None = Field(
+        default=None,
+        description="Token to pass as after for the next page, None on the last page",
+    )
+
+
+class SimilarNote(ResponseNote):
+    score: float = Field(
+        ...,
+        description="Cosine similarity to the query or note, from -1 to 1",
+        example=0.42,
+    )
+
+
+class SimilarNotesResponse(Base):
+    notes: List[SimilarNote] = Field(
+        ...,
+        description="Closest notes first",
+    )
 
 
 class UpdateNote(Base):
@@ -96,6 +199,13 @@ class DetailResponseNote(ResponseNote):
     )
 
 
+class PartialDetailResponseNote(PartialNote):
+    history: List[ResponseNoteHistory] | None = Field(
+        default=None,
+        description="History by current note",
+    )
+
+
 class SummarizeResponseNote(Base):
     title: str = Field(
         ...,
@@ -108,6 +218,19 @@ class SummarizeResponseNote(Base):
     )
 
 
+class LengthHistogram(Base):
+    bin_edges: List[float] = Field(
+        ...,
+        description="Edges of the equal-width bins, one more than the counts",
+        example=[0, 10, 20, 30],
+    )
+    counts: List[int] = Field(
+        ...,
+        description="The number of notes per bin",
+        example=[12, 30, 4],
+    )
+
+
 class AnalyticsResponse(Base):
     total_words: int = Field(
         default=0,
@@ -119,6 +242,16 @@ class AnalyticsResponse(Base):
         description="The average length of notes",
         example=13,
     )
+    note_count: int = Field(
+        default=0,
+        description="The number of notes",
+        example=8,
+    )
+    average_note_chars: float = Field(
+        default=0,
+        description="The average length of notes in characters",
+        example=72.5,
+    )
     most_common_words: List[tuple] = Field(
         ...,
         description="The most common words in notes",
@@ -144,3 +277,12 @@ class AnalyticsResponse(Base):
             "Machine learning helps analyze large amounts of data..."
         ],
     )
+    length_percentiles: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Percentiles of the number of words per note",
+        example={"p50": 12, "p90": 48, "p99": 130},
+    )
+    length_histogram: LengthHistogram | None = Field(
+        default=None,
+        description="Histogram of the number of words per note",
+    )
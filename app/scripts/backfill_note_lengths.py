@@ -0,0 +1,31 @@
+"""Fill in the word_count column of existing notes.
+
+Run once after applying the note lengths migration. Notes are updated in
+batches, each in its own transaction, and the script can be stopped and
+run again:
+
+    python -m app.scripts.backfill_note_lengths --batch-size 1000
+"""
+import argparse
+import asyncio
+
+from app.config import get_settings
+from app.crud import crud_analytics
+from app.database import async_session_maker
+
+settings = get_settings()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=settings.ANALYTICS_SCAN_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    async with async_session_maker() as db:
+        updated = await crud_analytics.backfill_note_lengths(db=db, batch_size=args.batch_size)
+
+    print(f"{updated} notes updated")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""Benchmark the analytics engine against the number of worker processes.
+
+Folds synthetic notes with 0 (a single thread) up to the given number of
+workers and prints the time and speedup of each run:
+
+    python -m app.scripts.benchmark_analytics --notes 200000 --max-workers 8
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from app.analytics import engine
+from app.config import get_settings
+
+settings = get_settings()
+
+WORDS = (
+    "the note about python fastapi and sqlalchemy is great but we can't say it's done "
+    "yet, really. okay! (maybe) well-known notes, tags: work home ideas"
+).split()
+
+
+def make_notes(count: int, words_per_note: int) -> list:
+    rng = random.Random(0)
+    return [" ".join(rng.choices(WORDS, k=words_per_note)) + "." for _ in range(count)]
+
+
+async def partitions(notes: list, chunk_size: int):
+    for start in range(0, len(notes), chunk_size):
+        yield notes[start:start + chunk_size]
+
+
+async def run(notes: list, workers: int) -> float:
+    settings.ANALYTICS_WORKERS = workers
+    engine.close()
+
+    # Start the pool before timing, as a running server would have it.
+    if workers:
+        await engine.fold_partitions(partitions(notes[:workers], 1))
+
+    started = time.perf_counter()
+    await engine.fold_partitions(partitions(notes, settings.ANALYTICS_SCAN_CHUNK_SIZE))
+    elapsed = time.perf_counter() - started
+
+    engine.close()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=200_000)
+    parser.add_argument("--words", type=int, default=60)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    notes = make_notes(args.notes, args.words)
+    print(f"{args.notes} notes, {args.words} words each, {os.cpu_count()} cores")
+
+    baseline = await run(notes, 0)
+    print(f"thread      {baseline:8.2f}s")
+
+    for workers in range(1, args.max_workers + 1):
+        elapsed = await run(notes, workers)
+        print(f"{workers:2d} workers  {elapsed:8.2f}s  x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Benchmark the length distribution of the analytics on synthetic notes.
+
+Times the path the analytics take: the rows of ``analytics_length_counts``
+(each distinct word count and its number of notes) turned into arrays and
+passed to ``length_distribution`` with the counts as weights. It is
+compared with the same statistics computed over the rows in Python:
+
+    python -m app.scripts.benchmark_distribution --notes 1000000
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+import numpy as np
+
+from app.analytics.distribution import PERCENTILES, length_distribution
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def python_distribution(rows: list, bins: int):
+    ordered = sorted(rows)
+    total = sum(notes for _, notes in ordered)
+
+    def at_rank(rank: int) -> int:
+        seen = 0
+        for length, notes in ordered:
+            seen += notes
+            if seen > rank:
+                return length
+
+    percentiles = {}
+    for rank in PERCENTILES:
+        position = (total - 1) * rank / 100
+        low = at_rank(int(position))
+        high = at_rank(min(int(position) + 1, total - 1))
+        percentiles[f"p{rank}"] = low + (high - low) * (position - int(position))
+
+    low, high = ordered[0][0], ordered[-1][0]
+    width = (high - low) / bins or 1
+    counts = [0] * bins
+    for length, notes in ordered:
+        counts[min(int((length - low) / width), bins - 1)] += notes
+
+    return percentiles, counts
+
+
+def load_arrays(rows: list):
+    # As crud_analytics.load_length_counts builds them from the rows.
+    return (
+        np.array([length for length, _ in rows], dtype=np.int64),
+        np.array([notes for _, notes in rows], dtype=np.int64),
+    )
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # The length count rows as the driver returns them: Python ints.
+    lengths = Counter(int(rng.lognormvariate(3, 1)) for _ in range(args.notes))
+    rows = list(lengths.items())
+    bins = settings.ANALYTICS_HISTOGRAM_BINS
+
+    convert, (distinct, counts) = timed(load_arrays, rows)
+    vectorized, (percentiles, histogram) = timed(length_distribution, distinct, bins, weights=counts)
+    python, (python_percentiles, python_counts) = timed(python_distribution, rows, bins)
+
+    assert python_counts == histogram[1]
+    assert all(abs(python_percentiles[key] - value) < 1e-9 for key, value in percentiles.items())
+
+    print(f"{args.notes} notes, {len(rows)} distinct lengths, {bins} bins")
+    print(f"rows to arrays   {convert * 1000:8.3f} ms")
+    print(f"numpy stats      {vectorized * 1000:8.3f} ms")
+    print(f"python stats     {python * 1000:8.3f} ms  x{python / (convert + vectorized):.1f}")
+    print(f"percentiles      {percentiles}")
+
+
+if __name__ == "__main__":
+    main()
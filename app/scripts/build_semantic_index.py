@@ -0,0 +1,40 @@
+"""Compute missing note vectors and build the semantic search index.
+
+Vectors are filled in for notes that have none, in batches each in its own
+transaction, and the index of all vectors is written to SEMANTIC_INDEX_PATH.
+Servers memory-map it when they start:
+
+    python -m app.scripts.build_semantic_index --batch-size 1000
+"""
+import argparse
+import asyncio
+
+from app.config import get_settings
+from app.crud import crud_semantic
+from app.database import async_session_maker
+
+settings = get_settings()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=settings.ANALYTICS_SCAN_CHUNK_SIZE)
+    parser.add_argument("--path", default=settings.SEMANTIC_INDEX_PATH)
+    args = parser.parse_args()
+
+    async with async_session_maker() as db:
+        updated = await crud_semantic.backfill_embeddings(db=db, batch_size=args.batch_size)
+        print(f"{updated} note vectors computed")
+
+        index = await crud_semantic.build_index(db=db)
+
+    if index is None:
+        print("No notes to index")
+        return
+
+    index.save(args.path)
+    print(f"{len(index.ids)} notes in {len(index.centroids)} lists written to {args.path}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+"""Rebuild the analytics aggregates from the notes table.
+
+Run once after applying the analytics migration, and whenever the
+aggregates need to be repaired:
+
+    python -m app.scripts.rebuild_analytics
+"""
+import asyncio
+
+from app.crud import crud_analytics
+from app.database import async_session_maker
+
+
+async def main():
+    async with async_session_maker() as db:
+        await crud_analytics.rebuild_analytics(db=db)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+import heapq
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from app.analytics import tokenizer
+
+# Weights of a word in the title and in the content, the default weights of
+# PostgreSQL's ts_rank for the A and B labels of the search vector.
+TITLE_WEIGHT = 1.0
+CONTENT_WEIGHT = 0.4
+
+
+def terms(text: Optional[str]) -> List[str]:
+    """Lowercased words of ``text``."""
+
+    if not text:
+        return []
+    return [word.lower() for word in tokenizer.tokenize(text)]
+
+
+class InvertedIndex:
+    """Words of the notes mapped to the notes that contain them.
+
+    A stand-in for the ``search_vector`` of PostgreSQL where that is not
+    available. Words are matched as they are, without stemming or stop
+    words, and a note is ranked by the weighted number of times the query
+    words occur in it.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        # Words of each note, to take it out of the postings again.
+        self.words: Dict[int, List[str]] = {}
+
+    def add(self, note_id: int, title: Optional[str], content: Optional[str]) -> None:
+        """Index a note, replacing what was indexed for it before."""
+
+        self.remove(note_id)
+
+        weights = Counter()
+        for word in terms(title):
+            weights[word] += TITLE_WEIGHT
+        for word in terms(content):
+            weights[word] += CONTENT_WEIGHT
+
+        for word, weight in weights.items():
+            self.postings[word][note_id] = weight
+        if weights:
+            self.words[note_id] = list(weights)
+
+    def remove(self, note_id: int) -> None:
+        for word in self.words.pop(note_id, ()):
+            notes = self.postings[word]
+            del notes[note_id]
+            if not notes:
+                del self.postings[word]
+
+    def search(
+            self,
+            query: str,
+            limit: int,
+            after: Optional[Tuple[float, int]] = None,
+    ) -> List[Tuple[float, int]]:
+        """``(rank, note_id)`` of the best ``limit`` notes that contain every
+        word of ``query``, best first and then by descending id, as the
+        PostgreSQL search orders them. ``after`` is the last pair of the
+        previous page."""
+
+        words = set(terms(query))
+        if not words:
+            return []
+
+        postings = sorted((self.postings.get(word, {}) for word in words), key=len)
+
+        hits = []
+        for note_id, weight in postings[0].items():
+            rank = weight
+            for other in postings[1:]:
+                other_weight = other.get(note_id)
+                if other_weight is None:
+                    break
+                rank += other_weight
+            else:
+                if after is None or (rank, note_id) < after:
+                    hits.append((rank, note_id))
+
+        return heapq.nlargest(limit, hits)
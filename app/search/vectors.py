@@ -0,0 +1,195 @@
+import json
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from app.search.inverted_index import terms
+
+# Words are hashed into this many features before they are projected.
+HASH_FEATURES = 2 ** 20
+
+# Seed of the random projection. Changing it changes every vector, so the
+# stored ones would have to be computed again.
+PROJECTION_SEED = 1018
+
+# Number of dimensions each feature is projected onto.
+PROJECTION_NONZEROS = 8
+
+# Vectors compared with the centroids at a time when they are clustered.
+ASSIGN_CHUNK_SIZE = 10_000
+
+
+def _mix(keys: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, a cheap hash of 64-bit integers."""
+
+    keys = (keys ^ (keys >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    keys = (keys ^ (keys >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return keys ^ (keys >> np.uint64(31))
+
+
+def embed(text: Optional[str], dim: int) -> Optional[np.ndarray]:
+    """Unit vector of ``text``, or ``None`` when it has no words.
+
+    Words are hashed into features with sublinear term frequencies, and the
+    sparse feature vector is reduced to ``dim`` dimensions by a sparse
+    random projection, which roughly keeps the cosine similarity of texts.
+    Each feature adds ``+1`` or ``-1`` to ``PROJECTION_NONZEROS`` dimensions
+    picked by a hash of the feature, so the matrix, which has
+    ``HASH_FEATURES`` rows, is never held in memory.
+    """
+
+    return embed_terms(terms(text), dim)
+
+
+def embed_terms(words: Iterable[str], dim: int) -> Optional[np.ndarray]:
+    """``embed`` of a text whose lowercased words are ``words``."""
+
+    counts = Counter(zlib.crc32(word.encode()) % HASH_FEATURES for word in words)
+    if not counts:
+        return None
+
+    features = np.fromiter(counts.keys(), dtype=np.uint64, count=len(counts))
+    weights = 1 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+
+    keys = features[:, None] * np.uint64(PROJECTION_NONZEROS) + np.arange(PROJECTION_NONZEROS, dtype=np.uint64)
+    hashes = _mix(keys ^ (np.uint64(PROJECTION_SEED) << np.uint64(32)))
+    signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+
+    vector = np.bincount(
+        (hashes % np.uint64(dim)).astype(np.intp).ravel(),
+        weights=(signs * weights[:, None]).ravel(),
+        minlength=dim,
+    ).astype(np.float32)
+
+    norm = np.linalg.norm(vector)
+    if not norm:
+        return None
+    return vector / norm
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` highest scores, highest first."""
+
+    if len(scores) > k:
+        positions = np.argpartition(-scores, k)[:k]
+    else:
+        positions = np.arange(len(scores))
+    return positions[np.argsort(-scores[positions], kind="stable")]
+
+
+class IVFIndex:
+    """Inverted file index of unit vectors for approximate nearest neighbours.
+
+    The vectors are clustered around ``centroids`` with k-means and stored
+    grouped by cluster. A query is compared with the centroids and then only
+    with the vectors of the ``probes`` closest clusters. ``max_id`` is the
+    highest note id at build time, notes added later are not in the index.
+    """
+
+    FILES = ("centroids", "offsets", "ids", "vectors")
+
+    def __init__(
+            self,
+            centroids: np.ndarray,
+            offsets: np.ndarray,
+            ids: np.ndarray,
+            vectors: np.ndarray,
+            max_id: int,
+    ):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.vectors = vectors
+        self.max_id = max_id
+
+    @property
+    def dim(self) -> int:
+        return self.centroids.shape[1]
+
+    @classmethod
+    def build(
+            cls,
+            ids: np.ndarray,
+            vectors: np.ndarray,
+            max_id: int,
+            n_lists: Optional[int] = None,
+            iterations: int = 10,
+            sample_size: int = 50_000,
+    ) -> "IVFIndex":
+        """Cluster ``vectors`` into ``n_lists`` lists, by default about the
+        square root of their number. The centroids are trained on a sample
+        of at most ``sample_size`` vectors."""
+
+        n_lists = max(1, min(n_lists or math.isqrt(len(ids)), len(ids)))
+        rng = np.random.default_rng(PROJECTION_SEED)
+
+        sample = vectors
+        if len(vectors) > sample_size:
+            sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = cls._assign(sample, centroids)
+            for cluster in range(n_lists):
+                members = sample[assignment == cluster]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[cluster] = centroid / (np.linalg.norm(centroid) or 1)
+
+        assignment = cls._assign(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+
+        return cls(
+            centroids=centroids.astype(np.float32),
+            offsets=offsets.astype(np.int64),
+            ids=ids[order].astype(np.int64),
+            vectors=vectors[order].astype(np.float32),
+            max_id=max_id,
+        )
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Closest centroid of each vector, computed ``ASSIGN_CHUNK_SIZE``
+        vectors at a time to bound the memory of the similarities."""
+
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), ASSIGN_CHUNK_SIZE):
+            chunk = vectors[start:start + ASSIGN_CHUNK_SIZE]
+            assignment[start:start + ASSIGN_CHUNK_SIZE] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignment
+
+    def search(self, query: np.ndarray, k: int, probes: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Ids and cosine similarities of about the ``k`` nearest vectors."""
+
+        clusters = top_k(self.centroids @ query, probes)
+        positions = np.concatenate([
+            np.arange(self.offsets[cluster], self.offsets[cluster + 1]) for cluster in clusters
+        ])
+
+        scores = self.vectors[positions] @ query
+        best = top_k(scores, k)
+        return self.ids[positions[best]], scores[best]
+
+    def save(self, path: str) -> None:
+        """Write the index as ``.npy`` files into the directory ``path``."""
+
+        os.makedirs(path, exist_ok=True)
+        for name in self.FILES:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "meta.json"), "w") as meta:
+            json.dump({"max_id": self.max_id}, meta)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """Open an index written by ``save``, memory-mapping its arrays so
+        that processes on the host share the pages."""
+
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in cls.FILES}
+        with open(os.path.join(path, "meta.json")) as meta:
+            max_id = json.load(meta)["max_id"]
+        return cls(max_id=max_id, **arrays)
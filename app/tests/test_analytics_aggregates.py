@@ -0,0 +1,159 @@
+from collections import namedtuple
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.crud import crud_analytics, crud_semantic
+from app.crud.crud_note import create_note
+from app.schemas import note as schema
+from app.tests.fixtures import mock_get_db
+from app.workers import summary_worker
+
+LengthRow = namedtuple("LengthRow", ["word_count", "notes"])
+
+
+@pytest.fixture(autouse=True)
+def simple_tokenizer(monkeypatch):
+    def _tokenize_words(text):
+        return [word.strip(".,!?") for word in text.split() if word.strip(".,!?").isalpha()]
+
+    monkeypatch.setattr(crud_analytics, "tokenize_words", _tokenize_words)
+
+
+def test_analytics_delta_create_and_delete():
+    created = crud_analytics.analytics_delta(None, "Hello hello world 42.")
+    deleted = crud_analytics.analytics_delta("Hello hello world 42.", None)
+
+    assert created == {
+        "note_count": 1,
+        "total_words": 3,
+        "total_chars": 21,
+        "words": {"Hello": 1, "hello": 1, "world": 1},
+        "lengths": {3: 1},
+    }
+    assert deleted == {
+        "note_count": -1,
+        "total_words": -3,
+        "total_chars": -21,
+        "words": {"Hello": -1, "hello": -1, "world": -1},
+        "lengths": {3: -1},
+    }
+
+
+def test_analytics_delta_update_only_keeps_changes():
+    delta = crud_analytics.analytics_delta("note about python", "note about python and fastapi")
+
+    assert delta == {
+        "note_count": 0,
+        "total_words": 2,
+        "total_chars": 12,
+        "words": {"and": 1, "fastapi": 1},
+        "lengths": {5: 1, 3: -1},
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_notes_analytics_from_aggregates(mock_get_db):
+    totals = SimpleNamespace(shards=16, note_count=4, total_words=10, total_chars=60)
+    mock_get_db.execute.side_effect = [
+        MagicMock(one=lambda: totals),
+        MagicMock(all=lambda: [("note", 3), ("the", 2)]),
+        MagicMock(scalars=lambda: MagicMock(all=lambda: ["a", "bb", "ccc"])),
+        MagicMock(scalars=lambda: MagicMock(all=lambda: ["zzzz", "yyy", "xx"])),
+        MagicMock(all=lambda: [LengthRow(1, 1), LengthRow(3, 2), LengthRow(4, 1)]),
+    ]
+
+    result = await crud_analytics.exact_notes_analytics(db=mock_get_db)
+
+    assert mock_get_db.execute.call_count == 5
+    assert result.total_words == 10
+    assert result.average_note_length == 2.5
+    assert result.note_count == 4
+    assert result.average_note_chars == 15
+    assert result.most_common_words == [("note", 3), ("the", 2)]
+    assert result.shortest_notes == ["a", "bb", "ccc"]
+    assert result.longest_notes == ["xx", "yyy", "zzzz"]
+    assert result.length_percentiles["p50"] == 3
+    assert sum(result.length_histogram.counts) == 4
+
+
+def test_update_on_same_length_leaves_length_counts():
+    delta = crud_analytics.analytics_delta("note about python", "note about fastapi")
+
+    assert delta["lengths"] == {}
+
+
+@pytest.mark.asyncio
+async def test_apply_analytics_delta_moves_length_count(mock_get_db):
+    mock_get_db.execute.return_value = MagicMock(scalar=lambda: 3)
+
+    await crud_analytics.apply_analytics_delta(db=mock_get_db, old_content="one two", new_content="one two three")
+
+    statements = [str(call.args[0]) for call in mock_get_db.execute.call_args_list]
+    assert any("INSERT INTO public.analytics_length_counts" in statement for statement in statements)
+    assert any("DELETE FROM public.analytics_length_counts" in statement for statement in statements)
+
+
+def test_note_lengths():
+    assert crud_analytics.note_lengths("Hello hello world 42.") == {"word_count": 3, "char_length": 21}
+    assert crud_analytics.note_lengths(None) == {"word_count": None, "char_length": None}
+
+
+def test_note_embedding_of_given_words_matches_content():
+    content = "Notes about Python and FastAPI."
+    words = crud_analytics.note_words(content)
+
+    assert crud_semantic.note_embedding(content, words) == crud_semantic.note_embedding(content)
+
+
+@pytest.mark.asyncio
+async def test_create_note_tokenizes_content_once(mock_get_db, monkeypatch):
+    tokenized = []
+    tokenize_words = crud_analytics.tokenize_words
+
+    def _counting_tokenize_words(text):
+        tokenized.append(text)
+        return tokenize_words(text)
+
+    monkeypatch.setattr(crud_analytics, "tokenize_words", _counting_tokenize_words)
+    # The embedding is computed from the same words, not from the content.
+    monkeypatch.setattr(crud_semantic, "embed", MagicMock(side_effect=AssertionError))
+    monkeypatch.setattr(summary_worker, "notify", MagicMock())
+    # The aggregates are built, so the whole delta is written.
+    mock_get_db.execute.return_value = MagicMock(scalar=lambda: 1)
+
+    async def _mock_flush():
+        note = mock_get_db.add.call_args.args[0]
+        note.id, note.version = 7, 1
+
+    mock_get_db.flush.side_effect = _mock_flush
+
+    await create_note(db=mock_get_db, note_data=schema.CreateNote(title="Title", content="one two three"))
+
+    assert tokenized == ["one two three"]
+
+
+@pytest.mark.asyncio
+async def test_backfill_note_lengths_in_batches(mock_get_db):
+    Row = namedtuple("Row", ["id", "content"])
+    batches = [
+        [Row(id=1, content="one two"), Row(id=4, content="three")],
+        [Row(id=9, content="four five six")],
+        [],
+    ]
+    mock_get_db.execute.side_effect = lambda *args: MagicMock(all=lambda: batches.pop(0) if len(args) == 1 else None)
+
+    updated = await crud_analytics.backfill_note_lengths(db=mock_get_db, batch_size=2)
+
+    updates = [call.args[1] for call in mock_get_db.execute.call_args_list if len(call.args) == 2]
+    assert updated == 3
+    assert updates == [
+        [{"id": 1, "word_count": 2, "char_length": 7}, {"id": 4, "word_count": 1, "char_length": 5}],
+        [{"id": 9, "word_count": 3, "char_length": 13}],
+    ]
+    assert mock_get_db.commit.await_count == 2
+
+    batch_query = str(mock_get_db.execute.call_args_list[0].args[0])
+    assert "notes.word_count IS NULL" in batch_query
+    assert batch_query.endswith("FOR UPDATE")
@@ -0,0 +1,82 @@
+from collections import namedtuple
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app import metrics
+from app.crud import crud_analytics
+from app.schemas import note as schema
+from app.tests.fixtures import mock_get_db
+
+
+@pytest.fixture(autouse=True)
+def analytics(monkeypatch):
+    monkeypatch.setattr(crud_analytics, "analytics_cache", None)
+
+    exact = AsyncMock(side_effect=lambda db: schema.AnalyticsResponse(most_common_words=[], total_words=1))
+    monkeypatch.setattr(crud_analytics, "exact_notes_analytics", exact)
+
+    return exact
+
+
+def versions(mock_db, *values):
+    mock_db.execute.side_effect = [MagicMock(scalar=lambda value=value: value) for value in values]
+
+
+@pytest.mark.asyncio
+async def test_repeated_calls_hit_cache(mock_get_db, analytics):
+    exact = analytics
+    versions(mock_get_db, 7, 7, 7)
+    hits = metrics.counters["analytics_cache_hits"]
+
+    results = [await crud_analytics.get_notes_analytics(db=mock_get_db) for _ in range(3)]
+
+    assert exact.await_count == 1
+    assert mock_get_db.execute.call_count == 3
+    assert all(result.total_words == 1 for result in results)
+    assert metrics.counters["analytics_cache_hits"] == hits + 2
+
+
+@pytest.mark.asyncio
+async def test_write_invalidates_cache(mock_get_db, analytics):
+    exact = analytics
+    versions(mock_get_db, 7, 8, 8)
+
+    for _ in range(3):
+        await crud_analytics.get_notes_analytics(db=mock_get_db)
+
+    assert exact.await_count == 2
+    assert crud_analytics.analytics_cache[0] == 8
+
+
+@pytest.mark.asyncio
+async def test_bump_data_version_upserts_counter(mock_get_db):
+    mock_get_db.execute.return_value = MagicMock(scalar=lambda: 4)
+
+    bumped = await crud_analytics.bump_data_version(db=mock_get_db)
+
+    statement = str(mock_get_db.execute.call_args.args[0])
+    assert "INSERT INTO public.data_versions" in statement
+    assert "ON CONFLICT (name, shard) DO UPDATE" in statement
+    assert "RETURNING public.data_versions.version" in statement
+    shard = mock_get_db.execute.call_args.args[0].compile().params["shard"]
+    assert 0 <= shard < crud_analytics.COUNTER_SHARDS
+    assert bumped == (shard, 4)
+
+
+@pytest.mark.asyncio
+async def test_data_version_sums_shards(mock_get_db):
+    mock_get_db.execute.return_value = MagicMock(scalar=lambda: Decimal(12))
+
+    assert await crud_analytics.get_data_version(db=mock_get_db) == 12
+    assert "sum(public.data_versions.version)" in str(mock_get_db.execute.call_args.args[0])
+
+
+@pytest.mark.asyncio
+async def test_data_versions_per_shard(mock_get_db):
+    Row = namedtuple("Row", "shard version")
+    mock_get_db.execute.return_value = MagicMock(all=lambda: [Row(0, 3), Row(5, 9)])
+
+    assert await crud_analytics.get_data_versions(db=mock_get_db) == {0: 3, 5: 9}
+
@@ -0,0 +1,58 @@
+from collections import namedtuple
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.analytics.distribution import length_distribution
+from app.analytics.fold import AnalyticsFold
+from app.crud import crud_analytics
+from app.tests.fixtures import mock_get_db
+
+
+def test_length_distribution():
+    lengths = np.arange(1, 101)
+
+    percentiles, (edges, counts) = length_distribution(lengths, bins=4)
+
+    assert percentiles == pytest.approx({"p50": 50.5, "p90": 90.1, "p99": 99.01})
+    assert edges == [1.0, 25.75, 50.5, 75.25, 100.0]
+    assert counts == [25, 25, 25, 25]
+
+
+def test_length_distribution_empty():
+    assert length_distribution(np.array([], dtype=np.int64), bins=4) == ({}, None)
+
+
+def test_weighted_length_distribution_matches_repeated_lengths():
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(0, 200, size=1000)
+    distinct, counts = np.unique(lengths, return_counts=True)
+
+    percentiles, histogram = length_distribution(lengths, bins=7)
+    weighted_percentiles, weighted_histogram = length_distribution(distinct, bins=7, weights=counts)
+
+    assert weighted_percentiles == pytest.approx(percentiles)
+    assert weighted_histogram == histogram
+
+
+@pytest.mark.asyncio
+async def test_load_length_counts(mock_get_db):
+    Row = namedtuple("Row", ["word_count", "notes"])
+    mock_get_db.execute.return_value = MagicMock(all=lambda: [Row(4, 2), Row(7, 1)])
+
+    lengths, counts = await crud_analytics.load_length_counts(db=mock_get_db)
+
+    assert mock_get_db.execute.call_count == 1
+    assert "FROM public.analytics_length_counts" in str(mock_get_db.execute.call_args.args[0])
+    assert lengths.tolist() == [4, 7]
+    assert counts.tolist() == [2, 1]
+
+
+def test_fold_counts_lengths():
+    fold = AnalyticsFold()
+    fold.add(["one two", "three"], tokenize=str.split)
+    other = AnalyticsFold()
+    other.add(["four five"], tokenize=str.split)
+
+    assert fold.merge(other).length_counts == {2: 2, 1: 1}
@@ -0,0 +1,65 @@
+import pytest
+
+from app.analytics import engine, tokenizer
+from app.analytics.fold import AnalyticsFold
+
+NOTES = [
+    "Python is great.",
+    "FastAPI builds APIs with Python.",
+    "Short note.",
+    "A.",
+    "Notes about Python, FastAPI and SQLAlchemy go here.",
+    "Hello.",
+    "Python Python Python!",
+    "Same size 1.",
+    "Same size 2.",
+]
+
+
+async def partitions(size):
+    for start in range(0, len(NOTES), size):
+        yield NOTES[start:start + size]
+
+
+async def no_partitions():
+    return
+    yield
+
+
+def sequential_fold():
+    fold = AnalyticsFold()
+    fold.add(NOTES, tokenize=tokenizer.tokenize)
+    return fold
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    def _workers(count):
+        monkeypatch.setattr(engine.settings, "ANALYTICS_WORKERS", count)
+
+    yield _workers
+    engine.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [0, 2])
+async def test_fold_partitions_matches_sequential_fold(workers, count):
+    workers(count)
+
+    fold = await engine.fold_partitions(partitions(2))
+    expected = sequential_fold()
+
+    assert fold.response() == expected.response()
+    assert fold.word_counts == expected.word_counts
+    assert fold.note_count == expected.note_count
+    assert fold.total_chars == expected.total_chars
+
+
+@pytest.mark.asyncio
+async def test_fold_partitions_empty(workers):
+    workers(0)
+
+    fold = await engine.fold_partitions(no_partitions())
+
+    assert fold.note_count == 0
+    assert fold.response().total_words == 0
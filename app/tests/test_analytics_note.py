@@ -9,7 +9,7 @@ from app.tests.fixtures import mock_get_db
 
 @pytest.fixture
 def mock_get_analytics():
-    async def _mock_get_analytics(db):
+    async def _mock_get_analytics(db, mode=None):
         # Мок для даних аналітики
         notes = [
             {"content": "This is the first note."},
@@ -53,7 +53,7 @@ async def test_get_analytics_success(mock_get_db, mock_get_analytics):
 async def test_get_analytics_empty(mock_get_db):
     app.dependency_overrides[get_db] = lambda: mock_get_db
 
-    async def _mock_get_empty_analytics(db):
+    async def _mock_get_empty_analytics(db, mode=None):
         return {
             "total_words": 0,
             "average_note_length": 0,
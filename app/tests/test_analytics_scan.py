@@ -0,0 +1,79 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.analytics import engine
+from app.analytics.fold import AnalyticsFold
+from app.crud import crud_analytics
+from app.tests.fixtures import mock_get_db
+
+
+NOTES = [
+    "Python is great.",
+    "FastAPI builds APIs with Python.",
+    "Short note.",
+    "A.",
+    "Notes about Python, FastAPI and SQLAlchemy go here.",
+    "Hello.",
+    "Python Python Python!",
+]
+
+
+def simple_tokenize(text):
+    return [word.strip(".,!?") for word in text.split() if word.strip(".,!?").isalpha()]
+
+
+def expected_analytics():
+    sorted_notes = sorted(NOTES, key=len)
+    note_lengths = [len(simple_tokenize(note)) for note in NOTES]
+
+    return {
+        "total_words": sum(note_lengths),
+        "average_note_length": sum(note_lengths) / len(NOTES),
+        "note_count": len(NOTES),
+        "average_note_chars": sum(len(note) for note in NOTES) / len(NOTES),
+        "shortest_notes": sorted_notes[:3],
+        "longest_notes": sorted_notes[-3:],
+    }
+
+
+def test_fold_matches_full_sort():
+    fold = AnalyticsFold()
+    for start in range(0, len(NOTES), 2):
+        fold.add(NOTES[start:start + 2], tokenize=simple_tokenize)
+
+    response = fold.response()
+
+    assert response.model_dump(exclude={"most_common_words", "length_percentiles", "length_histogram"}) == expected_analytics()
+    assert response.most_common_words[0] == ("Python", 6)
+    assert fold.total_chars == sum(len(note) for note in NOTES)
+
+
+def test_merged_folds_match_single_fold():
+    single = AnalyticsFold()
+    single.add(NOTES, tokenize=simple_tokenize)
+
+    merged = AnalyticsFold()
+    for start in range(0, len(NOTES), 3):
+        shard = AnalyticsFold()
+        shard.add(NOTES[start:start + 3], tokenize=simple_tokenize)
+        merged.merge(shard)
+
+    assert merged.response() == single.response()
+    assert merged.word_counts == single.word_counts
+    assert merged.total_chars == single.total_chars
+
+
+@pytest.mark.asyncio
+async def test_scan_notes_streams_chunks(mock_get_db, monkeypatch):
+    async def partitions():
+        for start in range(0, len(NOTES), 2):
+            yield NOTES[start:start + 2]
+
+    mock_get_db.stream_scalars.return_value = MagicMock(partitions=partitions)
+    monkeypatch.setattr(engine.settings, "ANALYTICS_WORKERS", 0)
+
+    response = await crud_analytics.scan_notes_analytics(db=mock_get_db)
+
+    mock_get_db.execute.assert_not_called()
+    assert response.model_dump(exclude={"most_common_words", "length_percentiles", "length_histogram"}) == expected_analytics()
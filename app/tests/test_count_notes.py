@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.crud import crud_note
+from app.crud.crud_note import count_notes, delete_note, get_notes
+from app.database import get_db
+from app.main import app
+from app.schemas import note as schema
+from app.tests.fixtures import mock_get_db
+
+
+def results(mock_db, *values):
+    mock_db.execute.side_effect = [MagicMock(scalar=lambda value=value: value) for value in values]
+
+
+def statements(mock_db):
+    return [str(call.args[0]) for call in mock_db.execute.call_args_list]
+
+
+@pytest.fixture
+def strategy(monkeypatch):
+    def _strategy(name):
+        monkeypatch.setattr(crud_note.settings, "NOTES_COUNT_STRATEGY", name)
+
+    return _strategy
+
+
+@pytest.mark.asyncio
+async def test_exact_count(mock_get_db, strategy):
+    strategy("exact")
+    results(mock_get_db, 42)
+
+    assert await count_notes(db=mock_get_db) == 42
+    assert "count(public.notes.id)" in statements(mock_get_db)[0]
+
+
+@pytest.mark.asyncio
+async def test_estimated_count(mock_get_db, strategy):
+    strategy("estimated")
+    results(mock_get_db, 1000)
+
+    assert await count_notes(db=mock_get_db) == 1000
+    assert "pg_class" in statements(mock_get_db)[0]
+
+
+@pytest.mark.asyncio
+async def test_estimated_count_before_analyze(mock_get_db, strategy):
+    strategy("estimated")
+    results(mock_get_db, -1, 7)
+
+    assert await count_notes(db=mock_get_db) == 7
+
+
+@pytest.mark.asyncio
+async def test_maintained_count(mock_get_db, strategy):
+    strategy("maintained")
+    results(mock_get_db, 12)
+
+    assert await count_notes(db=mock_get_db) == 12
+    assert "sum(public.row_counts.count)" in statements(mock_get_db)[0]
+
+
+@pytest.mark.asyncio
+async def test_maintained_count_without_row(mock_get_db, strategy):
+    strategy("maintained")
+    results(mock_get_db, None, 3)
+
+    assert await count_notes(db=mock_get_db) == 3
+
+
+def test_unknown_strategy_fails_settings(monkeypatch):
+    monkeypatch.setenv("NOTES_COUNT_STRATEGY", "guess")
+
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+@pytest.mark.asyncio
+async def test_get_notes_skips_count(mock_get_db):
+    rows = [SimpleNamespace(id=1, version=1, title="Title", content="Content")]
+    mock_get_db.execute.side_effect = [MagicMock(all=lambda: rows)]
+
+    result = await get_notes(db=mock_get_db, summary_mode=schema.SummaryMode.none, with_count=False)
+
+    assert mock_get_db.execute.call_count == 1
+    assert result.count_items is None
+
+
+@pytest.mark.asyncio
+async def test_delete_note_updates_counter(mock_get_db):
+    mock_get_db.execute.side_effect = [
+        MagicMock(scalar=lambda: None),
+        MagicMock(rowcount=1),
+        MagicMock(),
+    ]
+
+    assert await delete_note(db=mock_get_db, note_id=1) is True
+    assert "INSERT INTO public.row_counts" in statements(mock_get_db)[2]
+
+
+def test_get_notes_route_count_parameter(mock_get_db, monkeypatch):
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+    calls = []
+
+    async def _mock_get_notes(db, limit, offset, summary_mode, after=None, with_count=True, fields=None):
+        calls.append(with_count)
+        return schema.ResponseNotes(notes=[], count_items=None if not with_count else 0, summary_mode=summary_mode)
+
+    monkeypatch.setattr(crud_note, "get_notes", _mock_get_notes)
+
+    client = TestClient(app)
+    response = client.get("/notes", params={"count": "false"})
+
+    assert response.status_code == 200
+    assert response.json()["count_items"] is None
+    assert calls == [False]
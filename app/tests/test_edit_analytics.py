@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.crud import crud_edits, crud_note
+from app.database import get_db
+from app.main import app
+from app.schemas import edits as schema
+from app.tests.fixtures import mock_get_db
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.asyncio
+async def test_record_edit_upserts_both_rollups(mock_get_db):
+    await crud_edits.record_edit(db=mock_get_db, note_id=3)
+
+    statements = [compiled(call.args[0]) for call in mock_get_db.execute.call_args_list]
+    assert "INSERT INTO public.edit_rollups" in statements[0]
+    assert "ON CONFLICT (hour, shard) DO UPDATE SET edits = (public.edit_rollups.edits +" in statements[0]
+    assert "INSERT INTO public.note_edit_rollups" in statements[1]
+    assert "ON CONFLICT (hour, note_id) DO UPDATE" in statements[1]
+    assert "date_trunc('hour', now())" in statements[1]
+
+
+@pytest.mark.asyncio
+async def test_get_edit_counts_reads_rollups(mock_get_db):
+    rows = [(datetime(2026, 10, 17), 5), (datetime(2026, 10, 18), 2)]
+    mock_get_db.execute.return_value = MagicMock(all=lambda: rows)
+
+    result = await crud_edits.get_edit_counts(
+        db=mock_get_db,
+        interval=schema.EditInterval.day,
+        start=datetime(2026, 10, 17, 9, 30, tzinfo=timezone.utc),
+        end=datetime(2026, 10, 19),
+        note_id=3,
+    )
+
+    statement = compiled(mock_get_db.execute.call_args.args[0])
+    assert "FROM public.note_edit_rollups" in statement
+    assert "note_histories" not in statement
+    assert "date_trunc('day', public.note_edit_rollups.hour)" in statement
+    assert "public.note_edit_rollups.hour >= '2026-10-17 09:00:00'" in statement
+    assert "public.note_edit_rollups.hour < '2026-10-19 00:00:00'" in statement
+    assert result.total_edits == 7
+    assert [bucket.edits for bucket in result.buckets] == [5, 2]
+
+
+@pytest.mark.asyncio
+async def test_get_most_edited(mock_get_db):
+    mock_get_db.execute.return_value = MagicMock(all=lambda: [(2, "Busy", 9), (1, "Quiet", 1)])
+
+    result = await crud_edits.get_most_edited(db=mock_get_db, limit=2)
+
+    statement = compiled(mock_get_db.execute.call_args.args[0])
+    assert "FROM public.note_edit_rollups JOIN public.notes" in statement
+    assert "LIMIT 2" in statement
+    assert [(note.note_id, note.edits) for note in result.notes] == [(2, 9), (1, 1)]
+
+
+def test_edit_endpoints(mock_get_db, monkeypatch):
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+    calls = []
+
+    async def _mock_get_edit_counts(db, interval, start, end, note_id=None):
+        calls.append((interval, note_id))
+        return schema.EditCountsResponse(interval=interval, total_edits=0, buckets=[])
+
+    async def _mock_get_most_edited(db, limit, start, end):
+        return schema.MostEditedResponse(notes=[schema.NoteEdits(note_id=1, title="Test", edits=limit)])
+
+    async def _mock_check_note(db, note_id):
+        return note_id == 1
+
+    monkeypatch.setattr(crud_edits, "get_edit_counts", _mock_get_edit_counts)
+    monkeypatch.setattr(crud_edits, "get_most_edited", _mock_get_most_edited)
+    monkeypatch.setattr(crud_note, "check_note", _mock_check_note)
+
+    client = TestClient(app)
+
+    assert client.get("/notes/analytics/edits", params={"start": "2026-10-18T00:00:00"}).status_code == 200
+    assert client.get("/notes/analytics/most-edited", params={"limit": 3}).json()["notes"][0]["edits"] == 3
+    assert client.get("/notes/1/edits").json()["interval"] == "day"
+    assert client.get("/notes/2/edits").status_code == 404
+    assert calls == [(schema.EditInterval.hour, None), (schema.EditInterval.day, 1)]
@@ -0,0 +1,43 @@
+import pytest
+
+from app.ai_service.extractive import ExtractiveBackend, split_sentences, summarize_text
+
+
+TEXT = (
+    "FastAPI is a modern web framework for building APIs with Python. "
+    "The weather was nice yesterday. "
+    "FastAPI uses Python type hints to validate API requests. "
+    "My cat sleeps a lot."
+)
+
+
+def test_split_sentences():
+    assert split_sentences("First one. Second one!\nThird one?") == [
+        "First one.",
+        "Second one!",
+        "Third one?",
+    ]
+
+
+def test_summarize_text_picks_central_sentences():
+    assert summarize_text(TEXT) == "FastAPI uses Python type hints to validate API requests."
+    assert summarize_text(TEXT, max_sentences=2) == (
+        "FastAPI is a modern web framework for building APIs with Python. "
+        "FastAPI uses Python type hints to validate API requests."
+    )
+
+
+def test_summarize_text_short_notes():
+    assert summarize_text("") == ""
+    assert summarize_text("Only one sentence.") == "Only one sentence."
+    assert summarize_text("... !!! ???") == "..."
+
+
+@pytest.mark.asyncio
+async def test_extractive_backend_batch():
+    backend = ExtractiveBackend()
+
+    result = await backend.summarize_batch([TEXT, "Short note."])
+
+    assert result == [await backend.summarize(TEXT), "Short note."]
+    assert backend.model_id == "extractive-tfidf-1"
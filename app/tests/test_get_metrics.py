@@ -0,0 +1,18 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.main import app
+
+
+@pytest.mark.asyncio
+async def test_get_metrics_success(monkeypatch):
+    monkeypatch.setattr(metrics, "counters", metrics.Counter(summary_cache_hits=3, summary_cache_misses=1))
+    monkeypatch.setattr(metrics, "gauges", {"summary_cache_hit_rate": 0.75})
+
+    client = TestClient(app)
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.json()["counters"] == {"summary_cache_hits": 3, "summary_cache_misses": 1}
+    assert response.json()["gauges"] == {"summary_cache_hit_rate": 0.75}
@@ -13,7 +13,7 @@ from app.tests.fixtures import mock_get_db
 
 @pytest.fixture
 def mock_get_note_with_history():
-    async def _mock_get_note_with_history(db, note_id):
+    async def _mock_get_note_with_history(db, note_id, fields=None):
         if note_id == 1:
             note = models.Note(
                 id=1,
@@ -0,0 +1,61 @@
+import pytest
+from fastapi.testclient import TestClient
+from fastapi import status
+
+from app.crud import crud_note, crud_summary
+from app.database import get_db
+from app.main import app
+from app.schemas import note as schema
+from app.tests.fixtures import mock_get_db
+
+
+@pytest.fixture
+def mock_get_note():
+    async def _mock_get_note(db, note_id):
+        if note_id == 1:
+            return schema.ResponseNote(id=1, title="Test Title", content="Long content", version=1)
+        return None
+
+    return _mock_get_note
+
+
+@pytest.fixture
+def mock_stream_summary():
+    async def _mock_stream_summary(note_content):
+        yield "start", {"chunks": 2}
+        yield "partial", {"index": 1, "summary": "Second part"}
+        yield "partial", {"index": 0, "summary": "First part"}
+        yield "summary", {"summary": f"Summarized {note_content}", "fallback": False}
+
+    return _mock_stream_summary
+
+
+@pytest.mark.asyncio
+async def test_stream_note_summary_success(mock_get_db, mock_get_note, mock_stream_summary, monkeypatch):
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+    monkeypatch.setattr(crud_note, "get_note", mock_get_note)
+    monkeypatch.setattr(crud_summary, "stream_summary", mock_stream_summary)
+
+    client = TestClient(app)
+    response = client.get("/notes/1/summary")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.split("\n\n")[:4] == [
+        'event: start\ndata: {"chunks": 2}',
+        'event: partial\ndata: {"index": 1, "summary": "Second part"}',
+        'event: partial\ndata: {"index": 0, "summary": "First part"}',
+        'event: summary\ndata: {"summary": "Summarized Long content", "fallback": false}',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_note_summary_not_found(mock_get_db, mock_get_note, monkeypatch):
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+    monkeypatch.setattr(crud_note, "get_note", mock_get_note)
+
+    client = TestClient(app)
+    response = client.get("/notes/999/summary")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": "Note not found"}
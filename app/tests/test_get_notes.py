@@ -7,12 +7,11 @@ from app.main import app
 from app.models import models
 from app.schemas import note as schema
 from app.tests.fixtures import mock_get_db
-from app.ai_service import ai_service
 
 
 @pytest.fixture
 def mock_get_notes():
-    async def _mock_get_notes(db, limit, offset):
+    async def _mock_get_notes(db, limit, offset, summary_mode, after=None, with_count=True, fields=None):
         notes = [
             models.Note(id=i, title=f"Title {i}", content=f"Content {i}", version=1)
             for i in range(1, limit + 1)
@@ -28,24 +27,16 @@ def mock_get_notes():
                 for item in notes
             ],
             count_items=50,
+            summary_mode=summary_mode,
         )
 
     return _mock_get_notes
 
 
-@pytest.fixture
-def mock_summarize_note():
-    async def _mock_summarize_note(note_content: str):
-        return f"Summarized {note_content}"
-
-    return _mock_summarize_note
-
-
 @pytest.mark.asyncio
-async def test_get_notes_success(mock_get_db, mock_get_notes, mock_summarize_note):
+async def test_get_notes_success(mock_get_db, mock_get_notes):
     app.dependency_overrides[get_db] = lambda: mock_get_db
     crud_note.get_notes = mock_get_notes
-    ai_service.get_summarize_note = mock_summarize_note
 
     client = TestClient(app)
     response = client.get("/notes?page=1&size=5")
@@ -66,3 +57,22 @@ async def test_get_notes_invalid_pagination(mock_get_db):
 
     response = client.get("/notes?page=1&size=1001")
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_notes_summary_mode(mock_get_db, mock_get_notes):
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+    crud_note.get_notes = mock_get_notes
+
+    client = TestClient(app)
+
+    response = client.get("/notes?page=1&size=5")
+    assert response.status_code == 200
+    assert response.json()["summary_mode"] == "cached"
+
+    response = client.get("/notes?page=1&size=5&summary=none")
+    assert response.status_code == 200
+    assert response.json()["summary_mode"] == "none"
+
+    response = client.get("/notes?page=1&size=5&summary=stale")
+    assert response.status_code == 422
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.crud import crud_note
+from app.crud.crud_note import decode_cursor, encode_cursor, get_notes
+from app.database import get_db
+from app.main import app
+from app.schemas import note as schema
+from app.tests.fixtures import mock_get_db
+
+
+def rows(*ids):
+    return [SimpleNamespace(id=i, version=1, title=f"Title {i}", content=f"Content {i}") for i in ids]
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(1234)
+
+    assert cursor.isascii() and "=" not in cursor
+    assert decode_cursor(cursor) == 1234
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor("10"), "eyJub3BlIjoxfQ"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_notes_seeks_after_cursor(mock_get_db):
+    mock_get_db.execute.side_effect = [
+        MagicMock(all=lambda: rows(11, 12, 13)),
+        MagicMock(scalar=lambda: 30),
+    ]
+
+    result = await get_notes(db=mock_get_db, limit=2, after=10, summary_mode=schema.SummaryMode.none)
+
+    statement = compiled(mock_get_db.execute.call_args_list[0].args[0])
+    assert "WHERE public.notes.id > 10 ORDER BY public.notes.id" in statement
+    assert "LIMIT 3" in statement
+    assert "OFFSET" not in statement
+    assert [note.id for note in result.notes] == [11, 12]
+    assert decode_cursor(result.next_cursor) == 12
+
+
+@pytest.mark.asyncio
+async def test_get_notes_last_page_has_no_cursor(mock_get_db):
+    mock_get_db.execute.side_effect = [
+        MagicMock(all=lambda: rows(29, 30)),
+        MagicMock(scalar=lambda: 30),
+    ]
+
+    result = await get_notes(db=mock_get_db, limit=5, offset=25, summary_mode=schema.SummaryMode.none)
+
+    statement = compiled(mock_get_db.execute.call_args_list[0].args[0])
+    assert "ORDER BY public.notes.id" in statement
+    assert "OFFSET 25" in statement
+    assert result.next_cursor is None
+
+
+def test_get_notes_route_decodes_after(mock_get_db, monkeypatch):
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+    calls = []
+
+    async def _mock_get_notes(db, limit, offset, summary_mode, after=None, with_count=True, fields=None):
+        calls.append(after)
+        return schema.ResponseNotes(notes=[], count_items=0, summary_mode=summary_mode)
+
+    monkeypatch.setattr(crud_note, "get_notes", _mock_get_notes)
+
+    client = TestClient(app)
+
+    assert client.get("/notes", params={"after": encode_cursor(7)}).status_code == 200
+    assert client.get("/notes", params={"after": "garbage"}).status_code == 400
+    assert calls == [7]
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.ai_service import ai_service
+from app.crud import crud_summary
+from app.crud.crud_note import get_notes
+from app.schemas import note as schema
+from app.tests.fixtures import mock_get_db
+
+
+@pytest.fixture
+def notes_rows(mock_get_db):
+    rows = [
+        SimpleNamespace(
+            id=1, version=1, title="Fresh", content="Content 1",
+            summary="Summary 1", summary_content_hash=ai_service.content_hash("Content 1"),
+        ),
+        SimpleNamespace(
+            id=2, version=2, title="Stale", content="Content 2",
+            summary="Summary 1", summary_content_hash=ai_service.content_hash("Old content 2"),
+        ),
+        SimpleNamespace(
+            id=3, version=1, title="Missing", content="Content 3",
+            summary=None, summary_content_hash=None,
+        ),
+    ]
+    mock_get_db.execute.side_effect = [
+        MagicMock(all=lambda: rows),
+        MagicMock(scalar=lambda: len(rows)),
+    ]
+
+    return mock_get_db
+
+
+@pytest.mark.asyncio
+async def test_get_notes_cached_mode(notes_rows):
+    result = await get_notes(db=notes_rows, summary_mode=schema.SummaryMode.cached)
+
+    assert [note.content for note in result.notes] == ["Summary 1", "Summary 1", "Content 3"]
+    assert [note.summary_stale for note in result.notes] == [False, True, None]
+
+
+@pytest.mark.asyncio
+async def test_get_notes_fresh_mode(notes_rows, monkeypatch):
+    summarized = []
+
+    async def _mock_get_summaries(db, notes_content):
+        summarized.extend(notes_content)
+        return [f"New summary of {content}" for content in notes_content]
+
+    monkeypatch.setattr(crud_summary, "get_summaries", _mock_get_summaries)
+
+    result = await get_notes(db=notes_rows, summary_mode=schema.SummaryMode.fresh)
+
+    assert summarized == ["Content 2", "Content 3"]
+    assert [note.content for note in result.notes] == [
+        "Summary 1",
+        "New summary of Content 2",
+        "New summary of Content 3",
+    ]
+    assert [note.summary_stale for note in result.notes] == [False, False, False]
@@ -0,0 +1,193 @@
+from collections import namedtuple
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.crud import crud_note
+from app.crud.crud_note import LIST_FIELDS, get_note_with_history, get_notes, parse_fields
+from app.database import get_db
+from app.main import app
+from app.schemas import note as schema
+from app.tests.fixtures import mock_get_db
+
+
+def compiled(statement):
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_parse_fields_adds_id():
+    assert parse_fields("title, version", LIST_FIELDS) == {"id", "title", "version"}
+
+
+def test_parse_fields_rejects_unknown():
+    with pytest.raises(HTTPException) as error:
+        parse_fields("title,history", LIST_FIELDS)
+
+    assert error.value.status_code == 400
+    assert "history" in error.value.detail
+
+
+@pytest.mark.asyncio
+async def test_get_notes_selects_only_requested_columns(mock_get_db):
+    Row = namedtuple("Row", "id title")
+    mock_get_db.execute.side_effect = [
+        MagicMock(all=lambda: [Row(1, "Title 1"), Row(2, "Title 2")]),
+        MagicMock(scalar=lambda: 2),
+    ]
+
+    result = await get_notes(db=mock_get_db, limit=10, fields={"id", "title"})
+
+    statement = compiled(mock_get_db.execute.call_args_list[0].args[0])
+    assert statement.startswith("SELECT public.notes.id, public.notes.title \nFROM")
+    assert [note.model_dump(exclude_unset=True) for note in result.notes] == [
+        {"id": 1, "title": "Title 1"},
+        {"id": 2, "title": "Title 2"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_notes_fields_with_content_use_summary(mock_get_db):
+    Row = namedtuple("Row", "id content summary summary_content_hash")
+    mock_get_db.execute.side_effect = [
+        MagicMock(all=lambda: [Row(1, "Content 1", "Summary 1", "stale"), Row(2, "Content 2", None, None)]),
+        MagicMock(scalar=lambda: 2),
+    ]
+
+    result = await get_notes(db=mock_get_db, limit=10, fields={"id", "content"})
+
+    statement = compiled(mock_get_db.execute.call_args_list[0].args[0])
+    assert "public.notes.summary" in statement
+    assert "public.notes.title" not in statement
+    assert [note.model_dump(exclude_unset=True) for note in result.notes] == [
+        {"id": 1, "content": "Summary 1", "summary_stale": True},
+        {"id": 2, "content": "Content 2", "summary_stale": None},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_note_with_history_fields(mock_get_db):
+    Row = namedtuple("Row", "id title")
+    History = namedtuple("History", "id version content updated_at")
+    updated_at = datetime(2024, 1, 1)
+    mock_get_db.execute.side_effect = [
+        MagicMock(first=lambda: Row(1, "Title 1")),
+        MagicMock(all=lambda: [History(5, 1, "Old content", updated_at)]),
+    ]
+
+    result = await get_note_with_history(db=mock_get_db, note_id=1, fields={"id", "title", "history"})
+
+    statement = compiled(mock_get_db.execute.call_args_list[0].args[0])
+    assert statement.startswith("SELECT public.notes.id, public.notes.title \nFROM")
+    assert result.model_dump(exclude_unset=True) == {
+        "id": 1,
+        "title": "Title 1",
+        "history": [{"id": 5, "version": 1, "content": "Old content", "updated_at": updated_at}],
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_note_with_history_fields_not_found(mock_get_db):
+    mock_get_db.execute.return_value = MagicMock(first=lambda: None)
+
+    assert await get_note_with_history(db=mock_get_db, note_id=1, fields={"id"}) is None
+    assert mock_get_db.execute.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_notes_endpoint_returns_only_fields(mock_get_db):
+    async def _mock_get_notes(db, limit, offset, summary_mode, after=None, with_count=True, fields=None):
+        assert fields == {"id", "title"}
+        note = schema.PartialListResponseNote(id=1, title="Title 1")
+        return schema.PartialResponseNotes(notes=[note], count_items=1, summary_mode=summary_mode)
+
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+    original = crud_note.get_notes
+    crud_note.get_notes = _mock_get_notes
+
+    try:
+        client = TestClient(app)
+        response = client.get("/notes?fields=title")
+    finally:
+        crud_note.get_notes = original
+        app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json()["notes"] == [{"id": 1, "title": "Title 1"}]
+
+
+@pytest.mark.asyncio
+async def test_get_note_endpoint_rejects_unknown_field(mock_get_db):
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+
+    try:
+        client = TestClient(app)
+        response = client.get("/notes/1?fields=title,owner")
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_notes_endpoint_keeps_null_fields_without_fields(mock_get_db, monkeypatch):
+    Row = namedtuple("Row", "id version title content")
+    mock_get_db.execute.side_effect = [
+        MagicMock(all=lambda: [Row(1, 1, "Title 1", "Content 1")]),
+    ]
+    monkeypatch.setattr(crud_note, "get_notes", get_notes)
+
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+
+    try:
+        client = TestClient(app)
+        response = client.get("/notes?summary=none&count=false")
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "notes": [{"id": 1, "version": 1, "title": "Title 1", "content": "Content 1", "summary_stale": None}],
+        "count_items": None,
+        "summary_mode": "none",
+        "next_cursor": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_get_note_endpoint_returns_only_fields(mock_get_db, monkeypatch):
+    Row = namedtuple("Row", "id version")
+    mock_get_db.execute.return_value = MagicMock(first=lambda: Row(1, 3))
+    monkeypatch.setattr(crud_note, "get_note_with_history", get_note_with_history)
+
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+
+    try:
+        client = TestClient(app)
+        response = client.get("/notes/1?fields=version")
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "version": 3}
+
+
+def test_fields_endpoints_document_partial_responses():
+    paths = TestClient(app).get("/openapi.json").json()["paths"]
+
+    schemas = {
+        path: paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        for path in ("/notes", "/notes/{note_id}")
+    }
+
+    assert [item["$ref"].rsplit("/", 1)[1] for item in schemas["/notes"]["anyOf"]] == [
+        "ResponseNotes",
+        "PartialResponseNotes",
+    ]
+    assert [item["$ref"].rsplit("/", 1)[1] for item in schemas["/notes/{note_id}"]["anyOf"]] == [
+        "DetailResponseNote",
+        "PartialDetailResponseNote",
+    ]
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import pytest
+
+from app import metrics
+from app.ai_service import ai_service
+from app.ai_service.backends import SummaryBackend
+from app.ai_service.resilience import AdaptiveLimiter, CircuitBreaker, CircuitOpenError, TokenBucket
+
+
+class QuotaError(Exception):
+    code = 429
+
+
+class FailingBackend(SummaryBackend):
+    model_id = "failing"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def summarize(self, note_content: str):
+        self.calls += 1
+        raise QuotaError("Resource has been exhausted")
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket("test", rate=50, burst=2)
+
+    started = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+
+    assert time.monotonic() - started >= 0.035
+
+
+def test_adaptive_limiter_aimd():
+    limiter = AdaptiveLimiter("test", min_limit=1, max_limit=8, latency_target=1)
+
+    limiter.record(latency=0.1, overloaded=True)
+    assert limiter.limit == 4
+
+    limiter.record(latency=0.1, overloaded=True)
+    assert limiter.limit == 4
+
+    for _ in range(4):
+        limiter.record(latency=0.1)
+    assert 4.9 < limiter.limit < 5
+
+
+def test_circuit_breaker_opens_and_recovers():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0)
+
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    breaker.check()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_refuses_calls(monkeypatch):
+    backend = FailingBackend()
+
+    monkeypatch.setattr(ai_service, "backend", backend)
+    monkeypatch.setattr(ai_service, "fallback_backend", None)
+    monkeypatch.setattr(ai_service, "limiter", AdaptiveLimiter("test", min_limit=1, max_limit=4, latency_target=10))
+    monkeypatch.setattr(ai_service, "rate_limiter", TokenBucket("test", rate=1000, burst=1000))
+    monkeypatch.setattr(ai_service, "breaker", CircuitBreaker("test", failure_threshold=2, reset_timeout=60))
+    monkeypatch.setattr(metrics, "counters", metrics.Counter())
+
+    for index in range(5):
+        assert await ai_service.try_summarize_notes([f"Content {index}"]) == [None]
+
+    assert backend.calls == 2
+    assert ai_service.breaker.state == CircuitBreaker.OPEN
+    assert ai_service.limiter.limit == 2
+    assert metrics.counters["test_breaker_rejected"] == 3
+    assert metrics.counters["summary_overloads"] == 2
+
+
+@pytest.mark.asyncio
+async def test_probe_cancelled_while_waiting_for_limiter(monkeypatch):
+    limiter = AdaptiveLimiter("test", min_limit=1, max_limit=1, latency_target=10)
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    monkeypatch.setattr(ai_service, "limiter", limiter)
+    monkeypatch.setattr(ai_service, "rate_limiter", TokenBucket("test", rate=1000, burst=1000))
+    monkeypatch.setattr(ai_service, "breaker", breaker)
+
+    async def _call():
+        return "summary"
+
+    async with limiter:
+        probe = asyncio.create_task(ai_service._call_backend(_call, timeout=1))
+        await asyncio.sleep(0)
+        assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.probing
+
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+    assert breaker.allows_calls()
+    assert await ai_service._call_backend(_call, timeout=1) == "summary"
+    assert breaker.state == CircuitBreaker.CLOSED
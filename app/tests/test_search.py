@@ -0,0 +1,276 @@
+import asyncio
+from collections import namedtuple
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+
+from app.config import Settings
+from app.crud import crud_search
+from app.crud.crud_search import decode_search_cursor, encode_search_cursor, search_notes
+from app.database import get_db
+from app.main import app
+from app.search.inverted_index import InvertedIndex
+from app.tests.fixtures import mock_get_db
+
+Row = namedtuple("Row", "id version title content")
+
+NOTES = [
+    Row(1, 1, "Python tips", "Use list comprehensions."),
+    Row(2, 1, "Groceries", "Milk, eggs and a python book."),
+    Row(3, 1, "Python and FastAPI", "FastAPI is a Python framework."),
+    Row(4, 1, "Empty", None),
+]
+
+
+def build_index():
+    index = InvertedIndex()
+    for note in NOTES:
+        index.add(note.id, note.title, note.content)
+    return index
+
+
+def test_index_ranks_title_above_content():
+    hits = build_index().search("Python", limit=10)
+
+    assert [note_id for _, note_id in hits] == [3, 1, 2]
+    assert hits[0][0] == pytest.approx(1.0 + 0.4)
+
+
+def test_index_requires_every_word():
+    index = build_index()
+
+    assert [note_id for _, note_id in index.search("python fastapi", limit=10)] == [3]
+    assert index.search("python rust", limit=10) == []
+    assert index.search("...", limit=10) == []
+
+
+def test_index_pages_after_cursor():
+    index = build_index()
+    first = index.search("python", limit=2)
+
+    assert index.search("python", limit=2, after=first[-1]) == [index.search("python", limit=3)[-1]]
+
+
+def test_index_replaces_and_removes_notes():
+    index = build_index()
+
+    index.add(1, "Rust tips", "Use iterators.")
+    assert [note_id for _, note_id in index.search("python", limit=10)] == [3, 2]
+    assert [note_id for _, note_id in index.search("rust", limit=10)] == [1]
+
+    index.remove(1)
+    index.remove(1)
+    assert index.search("rust", limit=10) == []
+    assert "rust" not in index.postings
+
+
+def test_search_cursor_round_trip():
+    assert decode_search_cursor(encode_search_cursor(0.0607927, 12)) == (0.0607927, 12)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_search_cursor("high", 1), "eyJpZCI6MX0"])
+def test_invalid_search_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_search_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_postgres_uses_search_vector(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_search.settings, "SEARCH_BACKEND", "postgres")
+    SearchRow = namedtuple("SearchRow", "id version title content rank")
+    mock_get_db.execute.return_value = MagicMock(all=lambda: [
+        SearchRow(3, 1, "Python and FastAPI", "FastAPI is a Python framework.", 0.9),
+        SearchRow(1, 1, "Python tips", "Use list comprehensions.", 0.6),
+    ])
+
+    result = await search_notes(db=mock_get_db, query="python", limit=1, after=(1.0, 7))
+
+    statement = mock_get_db.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+    sql = " ".join(str(statement).split())
+    assert "WHERE (public.notes.search_vector @@ websearch_to_tsquery(" in sql
+    assert "public.notes.id) < (%(param_1)s, %(param_2)s)" in sql
+    assert "ORDER BY ts_rank(" in sql and "public.notes.id DESC" in sql
+    assert {"param_1": 1.0, "param_2": 7, "param_3": 2}.items() <= statement.params.items()
+    assert "english" in statement.params.values() and "python" in statement.params.values()
+    assert [note.id for note in result.notes] == [3]
+    assert decode_search_cursor(result.next_cursor) == (0.9, 3)
+
+
+@pytest.mark.asyncio
+async def test_search_memory_builds_index_once_per_version(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_search.settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(crud_search, "memory_index", None)
+
+    async def get_data_versions(db):
+        return {0: 5}
+
+    async def partitions():
+        yield NOTES[:2]
+        yield NOTES[2:]
+
+    monkeypatch.setattr(crud_search.crud_analytics, "get_data_versions", get_data_versions)
+    mock_get_db.stream.return_value = MagicMock(partitions=partitions)
+    mock_get_db.execute.return_value = MagicMock(all=lambda: NOTES[:3])
+
+    result = await search_notes(db=mock_get_db, query="python", limit=2)
+    await search_notes(db=mock_get_db, query="python", limit=2)
+
+    assert mock_get_db.stream.await_count == 1
+    assert [note.id for note in result.notes] == [3, 1]
+    assert result.notes[0].title == "Python and FastAPI"
+    assert decode_search_cursor(result.next_cursor)[1] == 1
+
+
+@pytest.mark.asyncio
+async def test_search_memory_rebuilds_at_most_once_per_interval(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_search.settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(crud_search.settings, "SEARCH_INDEX_REFRESH", 60)
+    monkeypatch.setattr(crud_search, "memory_index", None)
+    versions = iter([{0: 5}, {0: 6}])
+
+    async def get_data_versions(db):
+        return next(versions)
+
+    async def partitions():
+        yield NOTES
+
+    monkeypatch.setattr(crud_search.crud_analytics, "get_data_versions", get_data_versions)
+    mock_get_db.stream.return_value = MagicMock(partitions=partitions)
+    mock_get_db.execute.return_value = MagicMock(all=lambda: [])
+
+    await search_notes(db=mock_get_db, query="python", limit=2)
+    await search_notes(db=mock_get_db, query="python", limit=2)
+    assert mock_get_db.stream.await_count == 1
+
+    monkeypatch.setattr(crud_search.settings, "SEARCH_INDEX_REFRESH", 0)
+    await search_notes(db=mock_get_db, query="python", limit=2)
+    assert mock_get_db.stream.await_count == 2
+
+
+def test_writes_are_applied_to_memory_index(monkeypatch):
+    monkeypatch.setattr(crud_search, "memory_index", ({0: 5}, 0.0, build_index()))
+
+    crud_search.index_note(5, "Python notes", None, (0, 6))
+    crud_search.unindex_note(3, (1, 1))
+
+    hits = crud_search.memory_index[2].search("python", limit=10)
+    assert [note_id for _, note_id in hits] == [5, 1, 2]
+    assert crud_search.memory_index[0] == {0: 6, 1: 1}
+
+
+def test_writes_after_other_writes_leave_version(monkeypatch):
+    monkeypatch.setattr(crud_search, "memory_index", ({0: 5}, 0.0, build_index()))
+
+    # Version 6 of the shard was written by another process.
+    crud_search.index_note(5, "Python notes", None, (0, 7))
+
+    assert crud_search.memory_index[0] == {0: 5}
+
+
+@pytest.mark.asyncio
+async def test_search_after_local_write_does_not_rebuild(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_search.settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(crud_search.settings, "SEARCH_INDEX_REFRESH", 60)
+    monkeypatch.setattr(crud_search, "memory_index", None)
+    stored = {0: 5}
+
+    async def get_data_versions(db):
+        return dict(stored)
+
+    async def partitions():
+        yield NOTES
+
+    monkeypatch.setattr(crud_search.crud_analytics, "get_data_versions", get_data_versions)
+    mock_get_db.stream.return_value = MagicMock(partitions=partitions)
+    mock_get_db.execute.return_value = MagicMock(all=lambda: [])
+
+    await search_notes(db=mock_get_db, query="python", limit=2)
+
+    # A create of this process moves shard 0 on and is applied to the index.
+    stored[0] = 6
+    crud_search.index_note(5, "Python notes", None, (0, 6))
+
+    monkeypatch.setattr(crud_search.settings, "SEARCH_INDEX_REFRESH", 0)
+    await search_notes(db=mock_get_db, query="python", limit=2)
+
+    assert mock_get_db.stream.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_rebuild_once(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_search.settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(crud_search.settings, "SEARCH_INDEX_REFRESH", 60)
+    monkeypatch.setattr(crud_search, "memory_index", None)
+    monkeypatch.setattr(crud_search, "memory_index_lock", asyncio.Lock())
+
+    async def get_data_versions(db):
+        await asyncio.sleep(0)
+        return {0: 5}
+
+    async def partitions():
+        yield NOTES
+
+    monkeypatch.setattr(crud_search.crud_analytics, "get_data_versions", get_data_versions)
+    mock_get_db.stream.return_value = MagicMock(partitions=partitions)
+    mock_get_db.execute.return_value = MagicMock(all=lambda: [])
+
+    await asyncio.gather(*(search_notes(db=mock_get_db, query="python", limit=2) for _ in range(3)))
+
+    assert mock_get_db.stream.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_search_memory_reads_past_deleted_notes(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_search.settings, "SEARCH_BACKEND", "memory")
+    monkeypatch.setattr(crud_search, "memory_index", ({0: 5}, float("inf"), build_index()))
+    # Note 1 was deleted by another process and is still in the index.
+    stored = {note.id: note for note in NOTES if note.id != 1}
+
+    async def execute(statement):
+        ids = statement.compile().params["id_1"]
+        return MagicMock(all=lambda: [stored[note_id] for note_id in ids if note_id in stored])
+
+    mock_get_db.execute.side_effect = execute
+
+    result = await search_notes(db=mock_get_db, query="python", limit=1)
+
+    assert mock_get_db.execute.await_count == 2
+    assert [note.id for note in result.notes] == [3]
+    assert decode_search_cursor(result.next_cursor)[1] == 3
+
+
+def test_unknown_backend_fails_settings(monkeypatch):
+    monkeypatch.setenv("SEARCH_BACKEND", "elastic")
+
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint(mock_get_db):
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+    original = crud_search.search_notes
+
+    async def _mock_search_notes(db, query, limit, after):
+        assert (query, limit, after) == ("python", 5, (0.5, 3))
+        return crud_search.schema.SearchResponse(notes=[], next_cursor=None)
+
+    crud_search.search_notes = _mock_search_notes
+
+    try:
+        client = TestClient(app)
+        response = client.get(f"/notes/search?q=python&size=5&after={encode_search_cursor(0.5, 3)}")
+        missing = client.get("/notes/search")
+    finally:
+        crud_search.search_notes = original
+        app.dependency_overrides = {}
+
+    assert response.status_code == 200
+    assert response.json() == {"notes": [], "next_cursor": None}
+    assert missing.status_code == 422
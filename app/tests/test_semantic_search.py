@@ -0,0 +1,238 @@
+from collections import namedtuple
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.crud import crud_semantic
+from app.crud.crud_semantic import build_index, get_similar_notes, note_embedding, semantic_search
+from app.database import get_db
+from app.main import app
+from app.search import vectors as vectors_module
+from app.search.vectors import IVFIndex, embed
+from app.tests.fixtures import mock_get_db
+
+Row = namedtuple("Row", "id version title content embedding")
+
+CONTENTS = {
+    1: "Python web framework for building APIs quickly",
+    2: "Recipe for banana bread with walnuts",
+    3: "Building fast web APIs in Python",
+    4: "Banana bread recipe without walnuts",
+}
+
+
+def rows(*ids):
+    return [
+        Row(note_id, 1, f"Title {note_id}", CONTENTS[note_id], note_embedding(CONTENTS[note_id])["embedding"])
+        for note_id in ids
+    ]
+
+
+def stream(*partitions):
+    async def _partitions():
+        for partition in partitions:
+            yield partition
+
+    return MagicMock(partitions=_partitions)
+
+
+async def fetch(statement):
+    """Result of reading the notes of an ``id IN`` query."""
+
+    ids = statement.compile().params["id_1"]
+    return MagicMock(all=lambda: rows(*ids))
+
+
+def test_embed_is_deterministic_unit_vector():
+    vector = embed("Python web APIs", dim=64)
+
+    assert vector.dtype == np.float32 and vector.shape == (64,)
+    assert np.linalg.norm(vector) == pytest.approx(1.0)
+    assert np.array_equal(vector, embed("python web apis", dim=64))
+    assert embed("", dim=64) is None
+    assert embed("...", dim=64) is None
+
+
+def test_embed_keeps_texts_with_shared_words_close():
+    python = embed(CONTENTS[1], dim=256)
+
+    assert python @ embed(CONTENTS[3], dim=256) > python @ embed(CONTENTS[2], dim=256)
+
+
+def test_ivf_index_finds_nearest_and_round_trips(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((500, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = np.arange(1, 501, dtype=np.int64)
+
+    index = IVFIndex.build(ids=ids, vectors=vectors, max_id=500)
+    index.save(str(tmp_path))
+    loaded = IVFIndex.load(str(tmp_path))
+
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.max_id == 500 and loaded.dim == 32
+
+    found, scores = loaded.search(vectors[41], k=5, probes=len(loaded.centroids))
+    assert found[0] == 42
+    assert scores[0] == pytest.approx(1.0)
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_ivf_index_assigns_clusters_in_chunks(monkeypatch):
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((250, 16)).astype(np.float32)
+    centroids = rng.standard_normal((7, 16)).astype(np.float32)
+    monkeypatch.setattr(vectors_module, "ASSIGN_CHUNK_SIZE", 64)
+
+    assignment = IVFIndex._assign(vectors, centroids)
+
+    assert np.array_equal(assignment, np.argmax(vectors @ centroids.T, axis=1))
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_without_index_scores_every_note(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_semantic, "semantic_index", None)
+    mock_get_db.stream.return_value = stream(rows(1, 2), rows(3, 4))
+    mock_get_db.execute.side_effect = fetch
+
+    result = await semantic_search(db=mock_get_db, query="python APIs", limit=2)
+
+    assert mock_get_db.stream.await_count == 1
+    assert [note.id for note in result.notes] == [3, 1]
+    assert result.notes[0].score > result.notes[1].score > 0
+    assert result.notes[0].title == "Title 3"
+
+    vectors_query = " ".join(str(mock_get_db.stream.call_args.args[0]).split())
+    assert vectors_query.startswith("SELECT public.notes.id, public.notes.embedding FROM")
+    assert "length(public.notes.embedding) = :length_1" in vectors_query
+    assert vectors_query.endswith("ORDER BY public.notes.id DESC LIMIT :param_1")
+    assert sorted(mock_get_db.execute.call_args.args[0].compile().params["id_1"]) == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_skips_vectors_of_other_dimensions(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_semantic, "semantic_index", None)
+    monkeypatch.setattr(crud_semantic.settings, "SEMANTIC_VECTOR_DIM", 64)
+    mock_get_db.stream.return_value = stream()
+
+    await semantic_search(db=mock_get_db, query="python APIs", limit=2)
+
+    statement = mock_get_db.stream.call_args.args[0].compile()
+    assert statement.params["length_1"] == 64 * 4
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_combines_index_with_new_notes(mock_get_db, monkeypatch):
+    indexed = rows(1, 2)
+    index = IVFIndex.build(
+        ids=np.array([row.id for row in indexed]),
+        vectors=np.vstack([np.frombuffer(row.embedding, dtype=np.float32) for row in indexed]),
+        max_id=2,
+    )
+    monkeypatch.setattr(crud_semantic, "semantic_index", index)
+    mock_get_db.stream.side_effect = [stream(rows(3, 4)), stream(rows(1, 2))]
+    mock_get_db.execute.side_effect = fetch
+
+    result = await semantic_search(db=mock_get_db, query="banana bread", limit=3)
+
+    new_notes = str(mock_get_db.stream.call_args_list[0].args[0])
+    assert "notes.id >" in new_notes
+    assert {note.id for note in result.notes[:2]} == {2, 4}
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_without_words(mock_get_db):
+    result = await semantic_search(db=mock_get_db, query="?!", limit=5)
+
+    assert result.notes == []
+    mock_get_db.stream.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_similar_notes_exclude_the_note(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_semantic, "semantic_index", None)
+    mock_get_db.execute.side_effect = [MagicMock(first=lambda: rows(2)[0]), MagicMock(all=lambda: rows(4))]
+    mock_get_db.stream.return_value = stream(rows(1, 2, 3, 4))
+
+    result = await get_similar_notes(db=mock_get_db, note_id=2, limit=1)
+
+    assert [note.id for note in result.notes] == [4]
+
+
+@pytest.mark.asyncio
+async def test_build_index_fills_preallocated_arrays(mock_get_db):
+    mock_get_db.execute.side_effect = [MagicMock(scalar=lambda: 4), MagicMock(scalar=lambda: 3)]
+    # Note 4 got its vector after the count and waits for the next build.
+    mock_get_db.stream.return_value = stream(rows(1, 2), rows(3, 4))
+
+    index = await build_index(db=mock_get_db)
+
+    assert index.max_id == 4
+    assert sorted(index.ids.tolist()) == [1, 2, 3]
+    assert index.vectors.shape == (3, crud_semantic.settings.SEMANTIC_VECTOR_DIM)
+
+
+@pytest.mark.asyncio
+async def test_semantic_search_caps_notes_outside_the_index(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_semantic, "semantic_index", None)
+    monkeypatch.setattr(crud_semantic.settings, "SEMANTIC_EXHAUSTIVE_LIMIT", 100)
+    mock_get_db.stream.return_value = stream()
+
+    await semantic_search(db=mock_get_db, query="python APIs", limit=2)
+
+    assert mock_get_db.stream.call_args.args[0].compile().params["param_1"] == 100
+
+
+@pytest.mark.asyncio
+async def test_refresh_index_builds_missing_index(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_semantic, "semantic_index", None)
+    mock_get_db.execute.side_effect = [MagicMock(scalar=lambda: 4), MagicMock(scalar=lambda: 4)]
+    mock_get_db.stream.return_value = stream(rows(1, 2, 3, 4))
+
+    assert await crud_semantic.refresh_index(db=mock_get_db)
+    assert crud_semantic.semantic_index.max_id == 4
+
+
+@pytest.mark.asyncio
+async def test_refresh_index_waits_for_enough_new_notes(mock_get_db, monkeypatch):
+    index = IVFIndex.build(ids=np.array([1]), vectors=np.vstack([embed(CONTENTS[1], dim=256)]), max_id=1)
+    monkeypatch.setattr(crud_semantic, "semantic_index", index)
+    monkeypatch.setattr(crud_semantic.settings, "SEMANTIC_INDEX_REBUILD_TAIL", 3)
+    mock_get_db.execute.return_value = MagicMock(scalar=lambda: 2)
+
+    assert not await crud_semantic.refresh_index(db=mock_get_db)
+    assert crud_semantic.semantic_index is index
+    mock_get_db.stream.assert_not_called()
+
+    statement = mock_get_db.execute.call_args.args[0].compile()
+    assert "LIMIT" in str(statement) and statement.params["param_1"] == 3
+
+
+@pytest.mark.asyncio
+async def test_backfill_embeddings_locks_the_batch(mock_get_db):
+    Batch = namedtuple("Batch", "id content")
+    batches = [[Batch(1, CONTENTS[1])], []]
+    mock_get_db.execute.side_effect = lambda *args: MagicMock(all=lambda: batches.pop(0) if len(args) == 1 else None)
+
+    updated = await crud_semantic.backfill_embeddings(db=mock_get_db, batch_size=2)
+
+    assert updated == 1
+    batch_query = str(mock_get_db.execute.call_args_list[0].args[0])
+    assert "notes.embedding IS NULL" in batch_query
+    assert batch_query.endswith("FOR UPDATE")
+
+
+@pytest.mark.asyncio
+async def test_similar_notes_endpoint_not_found(mock_get_db):
+    mock_get_db.execute.return_value = MagicMock(first=lambda: None)
+    app.dependency_overrides[get_db] = lambda: mock_get_db
+
+    try:
+        client = TestClient(app)
+        response = client.get("/notes/7/similar")
+    finally:
+        app.dependency_overrides = {}
+
+    assert response.status_code == 404
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app import metrics
+from app.ai_service import ai_service
+from app.ai_service.backends import SummaryBackend
+from app.ai_service.gemini import GeminiBackend, parse_batch_response
+from app.ai_service.resilience import AdaptiveLimiter, CircuitBreaker, TokenBucket
+from app.ai_service.single_flight import SingleFlight
+
+
+class MockBackend(SummaryBackend):
+    model_id = "mock"
+
+    def __init__(self):
+        self.batches = []
+
+    async def summarize(self, note_content: str):
+        if note_content in ("fail", "broken"):
+            raise Exception("Provider error")
+        if note_content == "slow":
+            await asyncio.sleep(1)
+        await asyncio.sleep(0.01)
+        return f"Summarized {note_content}"
+
+    async def summarize_batch(self, notes_content):
+        self.batches.append(notes_content)
+        if "broken" in notes_content:
+            raise ValueError("Batch answer does not cover every note")
+        return [f"Batch {content}" for content in notes_content]
+
+
+@pytest.fixture
+def mock_backend(monkeypatch):
+    backend = MockBackend()
+
+    monkeypatch.setattr(ai_service, "backend", backend)
+    monkeypatch.setattr(ai_service, "fallback_backend", None)
+    monkeypatch.setattr(ai_service, "limiter", AdaptiveLimiter("test", min_limit=1, max_limit=2, latency_target=10))
+    monkeypatch.setattr(ai_service, "rate_limiter", TokenBucket("test", rate=1000, burst=1000))
+    monkeypatch.setattr(ai_service, "breaker", CircuitBreaker("test", failure_threshold=100, reset_timeout=10))
+    monkeypatch.setattr(ai_service.settings, "SUMMARY_TIMEOUT", 10)
+
+    return backend
+
+
+@pytest.mark.asyncio
+async def test_try_summarize_notes_keeps_order(mock_backend):
+    contents = [f"Content {i}" for i in range(5)]
+
+    result = await ai_service.try_summarize_notes(contents)
+
+    assert result == [f"Summarized Content {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_try_summarize_notes_marks_failures(mock_backend):
+    result = await ai_service.try_summarize_notes(["first", "fail", "last"])
+
+    assert result == ["Summarized first", None, "Summarized last"]
+
+
+@pytest.mark.asyncio
+async def test_try_summarize_notes_times_out(mock_backend, monkeypatch):
+    monkeypatch.setattr(ai_service.settings, "SUMMARY_TIMEOUT", 0.1)
+
+    assert await ai_service.try_summarize_notes(["slow"]) == [None]
+
+
+@pytest.mark.asyncio
+async def test_fallback_summary_is_raw_content(mock_backend):
+    assert await ai_service.fallback_summary("fail") == "fail"
+
+
+@pytest.mark.asyncio
+async def test_gemini_backend_does_not_block_event_loop(monkeypatch):
+    class BlockingModel:
+        def generate_content(self, prompt, request_options=None):
+            time.sleep(0.2)
+            return SimpleNamespace(text="Summary")
+
+    backend = GeminiBackend()
+    monkeypatch.setattr(backend, "model", BlockingModel())
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    result = await backend.summarize("Content")
+    ticker_task.cancel()
+    backend.close()
+
+    assert result == "Summary"
+    assert ticks > 5
+
+
+def test_pack_batches(monkeypatch):
+    monkeypatch.setattr(ai_service.settings, "SUMMARY_BATCH_MAX_CHARS", 10)
+    monkeypatch.setattr(ai_service.settings, "SUMMARY_BATCH_MAX_NOTES", 3)
+
+    batches = ai_service.pack_batches(["aaaa", "bbbb", "c", "d", "e", "f" * 20, "g"])
+
+    assert batches == [[0, 1, 2], [3, 4], [5], [6]]
+
+
+def test_parse_batch_response():
+    text = '```json\n[{"id": 1, "summary": "Second."}, {"id": 0, "summary": "First."}]\n```'
+
+    assert parse_batch_response(text, 2) == ["First.", "Second."]
+
+    with pytest.raises(ValueError):
+        parse_batch_response('[{"id": 0, "summary": "First."}]', 2)
+
+
+@pytest.mark.parametrize("ids", [("0", 1), (None, 1), (True, 1), (0.0, 1)])
+def test_parse_batch_response_rejects_non_integer_ids(ids):
+    text = json.dumps([{"id": note_id, "summary": "Summary."} for note_id in ids])
+
+    with pytest.raises(ValueError):
+        parse_batch_response(text, 2)
+
+
+@pytest.mark.asyncio
+async def test_try_summarize_batch_falls_back_per_note(mock_backend, monkeypatch):
+    monkeypatch.setattr(ai_service.settings, "SUMMARY_BATCH_MAX_NOTES", 2)
+
+    result = await ai_service.try_summarize_batch(["a", "b", "c", "broken", "d"])
+
+    assert mock_backend.batches == [["a", "b"], ["c", "broken"]]
+    assert result == ["Batch a", "Batch b", "Summarized c", None, "Summarized d"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_summaries_share_one_call(mock_backend, monkeypatch):
+    calls = []
+    original_summarize = mock_backend.summarize
+
+    async def _counting_summarize(note_content):
+        calls.append(note_content)
+        return await original_summarize(note_content)
+
+    monkeypatch.setattr(mock_backend, "summarize", _counting_summarize)
+    monkeypatch.setattr(ai_service.settings, "SUMMARY_BATCH_MAX_NOTES", 1)
+    monkeypatch.setattr(metrics, "counters", metrics.Counter())
+
+    results = await asyncio.gather(
+        ai_service.try_summarize_notes(["shared", "a"]),
+        ai_service.try_summarize_notes(["shared"]),
+        ai_service.try_summarize_batch(["shared", "b", "b"]),
+    )
+
+    assert results == [
+        ["Summarized shared", "Summarized a"],
+        ["Summarized shared"],
+        ["Summarized shared", "Summarized b", "Summarized b"],
+    ]
+    assert sorted(calls) == ["a", "b", "shared"]
+    assert metrics.counters["summary_singleflight_coalesced"] == 2
+
+
+def test_chunk_text():
+    text = "First sentence. Second sentence.\n\nThird paragraph here."
+
+    assert ai_service.chunk_text(text, 100) == [text]
+    assert ai_service.chunk_text(text, 40) == ["First sentence. Second sentence.\n\n", "Third paragraph here."]
+    assert ai_service.chunk_text("x" * 25, 10) == ["x" * 10, "x" * 10, "x" * 5]
+    assert "".join(ai_service.chunk_text(text * 50, 64)) == text * 50
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_summary(mock_backend, monkeypatch):
+    monkeypatch.setattr(ai_service.settings, "SUMMARY_CHUNK_CHARS", 20)
+
+    events = [event async for event in ai_service.map_reduce_summary("aaaa bbbb cccc dddd eeee ffff gggg")]
+
+    assert events[0] == ("start", {"chunks": 2})
+    assert sorted(data["index"] for event, data in events[1:3]) == [0, 1]
+    assert all(event == "partial" for event, _ in events[1:3])
+    assert events[-1][0] == "summary"
+    assert events[-1][1]["fallback"] is False
+    assert events[-1][1]["summary"].startswith("Summarized Summarized")
+
+
+@pytest.mark.asyncio
+async def test_closed_map_reduce_stream_keeps_shared_chunks(mock_backend, monkeypatch):
+    monkeypatch.setattr(ai_service.settings, "SUMMARY_CHUNK_CHARS", 20)
+    text = "aaaa bbbb cccc dddd eeee ffff gggg"
+
+    async def collect():
+        return [event async for event in ai_service.map_reduce_summary(text)]
+
+    first = ai_service.map_reduce_summary(text)
+    assert (await anext(first))[0] == "start"
+    first_partial = asyncio.create_task(anext(first))
+    await asyncio.sleep(0)
+
+    second = asyncio.create_task(collect())
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    first_partial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first_partial
+
+    events = await second
+    assert events[-1][0] == "summary"
+    assert events[-1][1]["fallback"] is False
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_waiters():
+    flight = SingleFlight("test")
+    started = asyncio.Event()
+
+    async def _slow():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(flight.do("k", _slow))
+    await started.wait()
+    waiter = asyncio.create_task(flight.do("k", _slow))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+
+    assert await waiter == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_without_callers():
+    flight = SingleFlight("test")
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def _slow():
+        started.set()
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    leader = asyncio.create_task(flight.do("k", _slow))
+    await started.wait()
+    leader.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert "k" not in flight._calls
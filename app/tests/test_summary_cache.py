@@ -0,0 +1,58 @@
+import pytest
+
+from app import metrics
+from app.ai_service import ai_service
+from app.crud import crud_summary
+from app.tests.fixtures import mock_get_db
+
+
+@pytest.fixture
+def summary_store(monkeypatch):
+    store = {ai_service.content_hash("cached"): "Cached summary"}
+    summarized = []
+
+    async def _mock_get_cached_summaries(db, content_hashes):
+        return {key: store[key] for key in content_hashes if key in store}
+
+    async def _mock_save_summaries(db, summaries):
+        store.update(summaries)
+
+    async def _mock_try_summarize_batch(notes_content):
+        summarized.extend(notes_content)
+        return [None if content == "fail" else f"Summarized {content}" for content in notes_content]
+
+    monkeypatch.setattr(crud_summary, "get_cached_summaries", _mock_get_cached_summaries)
+    monkeypatch.setattr(crud_summary, "save_summaries", _mock_save_summaries)
+    monkeypatch.setattr(ai_service, "try_summarize_batch", _mock_try_summarize_batch)
+    monkeypatch.setattr(metrics, "counters", metrics.Counter())
+
+    return store, summarized
+
+
+@pytest.mark.asyncio
+async def test_get_summaries_reads_cache_first(mock_get_db, summary_store):
+    store, summarized = summary_store
+
+    result = await crud_summary.get_summaries(
+        db=mock_get_db,
+        notes_content=["cached", "new", "fail", "new"],
+    )
+
+    assert result == ["Cached summary", "Summarized new", None, "Summarized new"]
+    assert summarized == ["new", "fail"]
+    assert ai_service.content_hash("new") in store
+    assert ai_service.content_hash("fail") not in store
+    assert metrics.counters["summary_cache_hits"] == 1
+    assert metrics.counters["summary_cache_misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_get_summaries_second_call_is_a_hit(mock_get_db, summary_store):
+    _, summarized = summary_store
+
+    await crud_summary.get_summaries(db=mock_get_db, notes_content=["new"])
+    result = await crud_summary.get_summaries(db=mock_get_db, notes_content=["new"])
+
+    assert result == ["Summarized new"]
+    assert summarized == ["new"]
+    assert metrics.counters["summary_cache_hits"] == 1
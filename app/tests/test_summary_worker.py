@@ -0,0 +1,100 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.ai_service import ai_service
+from app.crud import crud_analytics, crud_summary
+from app.crud.crud_note import create_note
+from app.models import models
+from app.schemas import note as schema
+from app.tests.fixtures import mock_get_db
+from app.workers import summary_worker
+
+
+@pytest.fixture
+def worker_db(monkeypatch):
+    notes = {1: "current", 2: "fail", 3: "newer"}
+    calls = {"summarized": [], "completed": {}, "retried": []}
+
+    mock_db = AsyncMock()
+    mock_db.execute.return_value = MagicMock(all=lambda: list(notes.items()))
+
+    @asynccontextmanager
+    async def _mock_session_maker():
+        yield mock_db
+
+    async def _mock_get_summaries(db, notes_content):
+        calls["summarized"].extend(notes_content)
+        return [None if content == "fail" else f"Summarized {content}" for content in notes_content]
+
+    async def _mock_complete_summary_job(db, job, summary):
+        calls["completed"][job.id] = summary
+
+    async def _mock_retry_summary_job(db, job, error):
+        calls["retried"].append(job.id)
+
+    monkeypatch.setattr(summary_worker, "async_session_maker", _mock_session_maker)
+    monkeypatch.setattr(crud_summary, "get_summaries", _mock_get_summaries)
+    monkeypatch.setattr(crud_summary, "complete_summary_job", _mock_complete_summary_job)
+    monkeypatch.setattr(crud_summary, "retry_summary_job", _mock_retry_summary_job)
+
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_process_jobs(worker_db):
+    jobs = [
+        models.SummaryJob(id=1, note_id=1, content_hash=ai_service.content_hash("current"), attempts=1),
+        models.SummaryJob(id=2, note_id=2, content_hash=ai_service.content_hash("fail"), attempts=1),
+        models.SummaryJob(id=3, note_id=3, content_hash=ai_service.content_hash("older"), attempts=1),
+        models.SummaryJob(id=4, note_id=4, content_hash=ai_service.content_hash("deleted"), attempts=1),
+    ]
+
+    await summary_worker.process_jobs(jobs)
+
+    assert worker_db["summarized"] == ["current", "fail"]
+    assert worker_db["completed"] == {1: "Summarized current", 3: None, 4: None}
+    assert worker_db["retried"] == [2]
+
+
+@pytest.mark.asyncio
+async def test_claim_fails_jobs_out_of_attempts(mock_get_db, monkeypatch):
+    monkeypatch.setattr(crud_summary.settings, "SUMMARY_JOB_MAX_ATTEMPTS", 3)
+    claimed = [
+        models.SummaryJob(id=1, status=models.SummaryJob.RUNNING, attempts=2),
+        models.SummaryJob(id=2, status=models.SummaryJob.FAILED, attempts=3),
+    ]
+    mock_get_db.execute.return_value = MagicMock(scalars=lambda: MagicMock(all=lambda: claimed))
+
+    jobs = await crud_summary.claim_summary_jobs(db=mock_get_db, limit=10)
+
+    statement = mock_get_db.execute.call_args.args[0].compile()
+    assert "status=CASE WHEN (public.summary_jobs.attempts >= :attempts_1)" in str(statement)
+    assert statement.params["attempts_1"] == 3
+    assert [job.id for job in jobs] == [1]
+    mock_get_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_create_note_enqueues_job_with_the_note(mock_get_db, monkeypatch):
+    commits_before_enqueue = []
+
+    def _mock_enqueue_summary_job(db, note_id, note_content):
+        commits_before_enqueue.append(mock_get_db.commit.await_count)
+
+    monkeypatch.setattr(crud_summary, "enqueue_summary_job", _mock_enqueue_summary_job)
+    monkeypatch.setattr(crud_analytics, "apply_analytics_delta", AsyncMock())
+    monkeypatch.setattr(summary_worker, "notify", MagicMock())
+    mock_get_db.execute.return_value = MagicMock()
+
+    async def _mock_flush():
+        note = mock_get_db.add.call_args.args[0]
+        note.id, note.version = 7, 1
+
+    mock_get_db.flush.side_effect = _mock_flush
+
+    await create_note(db=mock_get_db, note_data=schema.CreateNote(title="Title", content="Content"))
+
+    assert commits_before_enqueue == [0]
+    mock_get_db.flush.assert_awaited_once()
@@ -0,0 +1,50 @@
+import nltk
+import pytest
+from nltk.tokenize import NLTKWordTokenizer
+
+from app.analytics.tokenizer import tokenize
+
+# Every note is given as its sentences, so the reference tokenizer can run
+# without the punkt model.
+NOTES = [
+    ["This is the first note."],
+    ["This is the second note.", "Short note."],
+    ["Python is great.", "FastAPI builds APIs with Python!"],
+    ["I can't believe it's not butter?", "She said: \"wow\" (really) [sure] {ok} <tag>."],
+    ["We're done; you'll see, they've left.", "I'm here & there #tag @user $5 50%."],
+    ["Wanna go?", "Gimme that, lemme see, gotta run.", "CANNOT DO IT'S"],
+    ["Don’t stop — ever.", "The end...", "wait...now"],
+    ["a 'b c'", "it was 'a good' day."],
+    ["He said 'hello.'", "More'n ever, d'ye know?", "'Tis the season."],
+    ["x.y.z is a name.", "snake_case and abc123 words cost 1,000 or 3.88 dollars."],
+    ["He's the one's friend.", "words--dashes and*stars, well-known and/or o'clock."],
+    ["Naïve café in Straße, “quoted” «text».", "Ask Mr. Smith about it etc."],
+]
+
+
+def nltk_words(text):
+    return [word for word in nltk.word_tokenize(text) if word.isalpha()]
+
+
+@pytest.mark.parametrize("sentences", NOTES)
+def test_tokenize_matches_nltk_word_tokenizer(sentences):
+    tokenizer = NLTKWordTokenizer()
+    expected = [word for sentence in sentences for word in tokenizer.tokenize(sentence) if word.isalpha()]
+
+    assert tokenize(" ".join(sentences)) == expected
+
+
+@pytest.mark.parametrize("sentences", NOTES)
+def test_tokenize_matches_word_tokenize(sentences):
+    text = " ".join(sentences)
+    try:
+        expected = nltk_words(text)
+    except LookupError:
+        pytest.skip("punkt model is not installed")
+
+    assert tokenize(text) == expected
+
+
+def test_tokenize_empty_text():
+    assert tokenize("") == []
+    assert tokenize(" ... 42 !? ") == []
@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import get_settings
+from app.crud import crud_semantic
+from app.database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_task: Optional[asyncio.Task] = None
+
+
+async def _run_worker() -> None:
+    while True:
+        try:
+            async with async_session_maker() as db:
+                if await crud_semantic.refresh_index(db=db):
+                    logger.info(f"Semantic index rebuilt up to note {crud_semantic.semantic_index.max_id}")
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Semantic index worker failed: {e!r}")
+
+        await asyncio.sleep(settings.SEMANTIC_INDEX_CHECK_INTERVAL)
+
+
+def start_worker() -> None:
+    global _task
+
+    _task = asyncio.create_task(_run_worker())
+
+
+async def stop_worker() -> None:
+    global _task
+
+    if _task is None:
+        return
+
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from typing import List
+
+from sqlalchemy import select
+
+from app import metrics
+from app.config import get_settings
+from app.crud import crud_summary
+from app.database import async_session_maker
+from app.models.models import Note, SummaryJob
+from app.ai_service import ai_service
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+_tasks: List[asyncio.Task] = []
+_wakeup = asyncio.Event()
+
+
+def notify() -> None:
+    """Wake idle workers of this process after a job was committed."""
+
+    _wakeup.set()
+
+
+async def process_jobs(jobs: List[SummaryJob]) -> None:
+    async with async_session_maker() as db:
+        query = select(Note.id, Note.content).where(
+            Note.id.in_({job.note_id for job in jobs})
+        )
+        result = await db.execute(query)
+        contents = dict(result.all())
+
+        # Jobs of deleted notes, and jobs superseded by a newer write, are
+        # closed without calling the model.
+        current_jobs = []
+        for job in jobs:
+            content = contents.get(job.note_id)
+            if content is not None and ai_service.content_hash(content) == job.content_hash:
+                current_jobs.append(job)
+            else:
+                await crud_summary.complete_summary_job(db=db, job=job, summary=None)
+
+        if not current_jobs:
+            return
+
+        summaries = await crud_summary.get_summaries(
+            db=db,
+            notes_content=[contents[job.note_id] for job in current_jobs],
+        )
+
+        for job, summary in zip(current_jobs, summaries):
+            if summary is None:
+                await crud_summary.retry_summary_job(db=db, job=job, error="Summary failed")
+                metrics.increment("summary_jobs_failed")
+            else:
+                await crud_summary.complete_summary_job(db=db, job=job, summary=summary)
+                metrics.increment("summary_jobs_done")
+
+
+async def _run_worker(worker_id: int) -> None:
+    while True:
+        try:
+            # Leave the jobs queued while the provider is known to be down,
+            # instead of spending their attempts on refused calls.
+            if not ai_service.breaker.allows_calls():
+                await asyncio.sleep(settings.SUMMARY_WORKER_POLL_INTERVAL)
+                continue
+
+            async with async_session_maker() as db:
+                jobs = await crud_summary.claim_summary_jobs(
+                    db=db,
+                    limit=settings.SUMMARY_WORKER_BATCH_SIZE,
+                )
+
+            if jobs:
+                await process_jobs(jobs)
+                continue
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Summary worker {worker_id} failed: {e!r}")
+
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.SUMMARY_WORKER_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_workers() -> None:
+    for worker_id in range(settings.SUMMARY_WORKERS):
+        _tasks.append(asyncio.create_task(_run_worker(worker_id)))
+
+
+async def stop_workers() -> None:
+    for task in _tasks:
+        task.cancel()
+
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()